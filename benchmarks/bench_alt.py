@@ -0,0 +1,59 @@
+"""
+ALT (landmark) guided A* vs plain Dijkstra on random point to point queries
+
+    python benchmarks/bench_alt.py [V] [E] [landmarks] [queries]
+"""
+
+import random
+import sys
+import time
+
+from cspatterns.datastructures import graphs
+from cspatterns.greedy import landmarks, shortest_path
+
+
+def generate_graph(V, E, seed="alt"):
+    rnd = random.Random(seed)
+    g = graphs.WeightedDirectedGraph()
+    while g.num_edges() < E:
+        v, w = rnd.randrange(V), rnd.randrange(V)
+        if v != w:
+            g.add(v, w, float(rnd.randint(1, 100)))
+    return g
+
+
+def run(queries, heuristic):
+    settled = 0
+    start = time.perf_counter()
+    for s, t in queries:
+        settled += shortest_path.AStarShortestPath(g, s, t, heuristic).num_settled()
+    return settled / len(queries), (time.perf_counter() - start) / len(queries)
+
+
+if __name__ == "__main__":
+    V = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    E = int(sys.argv[2]) if len(sys.argv) > 2 else 4 * V
+    L = int(sys.argv[3]) if len(sys.argv) > 3 else 8
+    Q = int(sys.argv[4]) if len(sys.argv) > 4 else 200
+
+    g = generate_graph(V, E)
+    rnd = random.Random("queries")
+    vertices = list(g.vertices())
+    queries = [(rnd.choice(vertices), rnd.choice(vertices)) for _ in range(Q)]
+
+    start = time.perf_counter()
+    index = landmarks.LandmarkIndex(g, num_landmarks=L, seed=1)
+    print(
+        "V={} E={} landmarks={} preprocessing {:.2f}s".format(V, E, L, time.perf_counter() - start)
+    )
+
+    for label, heuristic in (
+        ("dijkstra", shortest_path.zero_heuristic),
+        ("alt", index.heuristic),
+    ):
+        settled, latency = run(queries, heuristic)
+        print(
+            "{:<10} settled/query {:10.1f}   latency {:8.3f}ms".format(
+                label, settled, latency * 1000
+            )
+        )
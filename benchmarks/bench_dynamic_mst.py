@@ -0,0 +1,72 @@
+"""
+DynamicMST vs recomputing Kruskal after every edit, on a stream
+of random link inserts and cost changes
+
+    python benchmarks/bench_dynamic_mst.py [V] [E] [updates]
+"""
+
+import random
+import sys
+import time
+
+from cspatterns.datastructures import graphs
+from cspatterns.greedy import mst
+
+
+def generate_graph(V, E, seed="dynamic-mst"):
+    rnd = random.Random(seed)
+    g = graphs.WeightedUndirectedGraph()
+    while g.num_edges() < E:
+        v, w = rnd.randrange(V), rnd.randrange(V)
+        if v != w:
+            g.add(v, w, float(rnd.randint(1, 100)))
+    return g
+
+
+def generate_updates(g, V, count, seed="updates"):
+    rnd = random.Random(seed)
+    edges = [(v, w) for v, w, _ in g.edges()]
+    updates = []
+    for _ in range(count):
+        if rnd.random() < 0.3:
+            v, w = rnd.randrange(V), rnd.randrange(V)
+            edges.append((v, w))
+        else:
+            v, w = rnd.choice(edges)
+        updates.append((v, w, float(rnd.randint(1, 100))))
+    return updates
+
+
+def apply(g, v, w, weight):
+    if g.has(v, w):
+        g.update_weight(v, w, weight)
+    else:
+        g.add(v, w, weight)
+
+
+if __name__ == "__main__":
+    V = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    E = int(sys.argv[2]) if len(sys.argv) > 2 else 4 * V
+    U = int(sys.argv[3]) if len(sys.argv) > 3 else 200
+
+    updates = generate_updates(generate_graph(V, E), V, U)
+    print("V={} E={} updates={}".format(V, E, U))
+
+    g = generate_graph(V, E)
+    start = time.perf_counter()
+    for v, w, weight in updates:
+        apply(g, v, w, weight)
+        full = mst.KruskalMST(g).extract()
+    recompute = time.perf_counter() - start
+    print("{:<24} {:8.3f}s".format("recompute (kruskal)", recompute))
+
+    g = generate_graph(V, E)
+    start = time.perf_counter()
+    dynamic = mst.DynamicMST(g)
+    for v, w, weight in updates:
+        dynamic.add(v, w, weight)
+    incremental = time.perf_counter() - start
+    print("{:<24} {:8.3f}s".format("DynamicMST", incremental))
+
+    assert dynamic.total_weight() == full.total_weight()
+    print("speedup: {:.2f}x".format(recompute / incremental))
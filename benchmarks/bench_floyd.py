@@ -0,0 +1,52 @@
+"""
+Compares the Floyd backends on a random dense graph
+
+    python benchmarks/bench_floyd.py [V] [workers] [block_size]
+"""
+
+import random
+import sys
+import time
+
+from cspatterns.datastructures import graphs
+from cspatterns.dp import shortest_path
+
+
+def generate_graph(V, density=0.2, seed="floyd"):
+    rnd = random.Random(seed)
+    dg = graphs.WeightedDirectedGraph()
+    for v in range(V):
+        for w in range(V):
+            if v != w and rnd.random() < density:
+                dg.add(v, w, rnd.randint(1, 100))
+    return dg
+
+
+def timeit(label, fn):
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    print("{:<24} {:8.3f}s".format(label, elapsed))
+    return elapsed, result
+
+
+if __name__ == "__main__":
+    V = int(sys.argv[1]) if len(sys.argv) > 1 else 1500
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else None
+    block_size = int(sys.argv[3]) if len(sys.argv) > 3 else 256
+
+    dg = generate_graph(V)
+    print("V={} E={} workers={} block_size={}".format(V, dg.num_edges(), workers, block_size))
+
+    base, numpy_floyd = timeit("numpy (single core)", lambda: shortest_path.Floyd(dg, "numpy"))
+    tiled, _ = timeit(
+        "blocked (single core)",
+        lambda: shortest_path.Floyd(dg, "blocked", block_size=block_size, workers=1),
+    )
+    parallel, blocked_floyd = timeit(
+        "blocked (process pool)",
+        lambda: shortest_path.Floyd(dg, "blocked", block_size=block_size, workers=workers),
+    )
+
+    assert (numpy_floyd._distances == blocked_floyd._distances).all()
+    print("speedup vs numpy: {:.2f}x (tiled) {:.2f}x (pool)".format(base / tiled, base / parallel))
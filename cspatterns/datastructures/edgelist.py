@@ -0,0 +1,193 @@
+"""
+Bulk loading of text edge lists (CSV/TSV/whitespace separated)
+
+    v w [weight]
+
+The file is streamed in chunks of `chunksize` lines (gzip compressed
+files are recognized by their magic bytes and decompressed on the
+fly). While reading, every label is interned to an int and the edges
+are collected in flat int/float arrays; nothing else is built per
+edge. Duplicates are then dropped in one vectorized pass (the last
+occurrence wins, just like repeated add() calls) and the adjacency
+is grouped by a counting sort, from which we fill either the mutable
+graph or the CSR snapshot directly.
+
+Needs numpy.
+"""
+
+import gzip
+import itertools
+import time
+from array import array
+
+import numpy as np
+
+from cspatterns.datastructures import graphs
+
+GZIP_MAGIC = b"\x1f\x8b"
+
+
+def _open(path, encoding):
+    with open(path, "rb") as f:
+        magic = f.read(2)
+    if magic == GZIP_MAGIC:
+        return gzip.open(path, "rt", encoding=encoding)
+    return open(path, "rt", encoding=encoding)
+
+
+def _columns(chunk, delimiter, ncols, comment):
+    """
+    Splits the lines into columns (lists of strings); we work on the
+    whole chunk at once, so that the per row work stays in C. Chunks
+    with comments, blank or ragged lines take the line by line way.
+    """
+    text = "".join(chunk)
+    if not (comment and comment in text):
+        if delimiter is None:
+            tokens = text.split()
+        else:
+            tokens = text.replace("\n", delimiter).split(delimiter)
+            if tokens and not tokens[-1]:
+                tokens.pop()
+        if len(tokens) == ncols * len(chunk):
+            return [tokens[i::ncols] for i in range(ncols)]
+
+    parts = [line.split(delimiter) for line in chunk]
+    parts = [p for p in parts if len(p) >= ncols and not p[0].startswith(comment)]
+    return [[p[i] for p in parts] for i in range(ncols)]
+
+
+def _read(path, weighted, chunksize, delimiter, label, comment, skip, encoding, report):
+    ids = {}
+    setdefault = ids.setdefault
+    sources = array("q")
+    targets = array("q")
+    weights = array("d")
+    rows = 0
+    start = time.perf_counter()
+
+    with _open(path, encoding) as f:
+        lines = itertools.islice(f, skip, None)
+        while True:
+            chunk = list(itertools.islice(lines, chunksize))
+            if not chunk:
+                break
+            rows += len(chunk)
+
+            columns = _columns(chunk, delimiter, 3 if weighted else 2, comment)
+            vs, ws = columns[0], columns[1]
+            if delimiter is not None:
+                vs = list(map(str.strip, vs))
+                ws = list(map(str.strip, ws))
+            if label is not str:
+                vs = list(map(label, vs))
+                ws = list(map(label, ws))
+
+            sources.extend([setdefault(v, len(ids)) for v in vs])
+            targets.extend([setdefault(w, len(ids)) for w in ws])
+            if weighted:
+                weights.extend(map(float, columns[2]))
+
+            if report is not None:
+                report(rows, rows / max(time.perf_counter() - start, 1e-9))
+
+    return list(ids), ids, sources, targets, weights if weighted else None
+
+
+def _dedup(sources, targets, weights, V, directed):
+    """Unique edges (last occurrence wins), in the order of the file"""
+    s = np.frombuffer(sources, dtype=np.int64)
+    t = np.frombuffer(targets, dtype=np.int64)
+    if not directed:
+        s, t = np.minimum(s, t), np.maximum(s, t)
+
+    _, last = np.unique((s * V + t)[::-1], return_index=True)
+    keep = np.sort(len(s) - 1 - last)
+    w = None if weights is None else np.frombuffer(weights, dtype=np.float64)[keep]
+    return s[keep], t[keep], w
+
+
+def _group(s, t, w, V, directed):
+    """CSR arrays (offsets, targets, weights); undirected edges are
+    stored in both directions, self loops once"""
+    if not directed:
+        back = s != t
+        s, t = np.concatenate((s, t[back])), np.concatenate((t, s[back]))
+        if w is not None:
+            w = np.concatenate((w, w[back]))
+
+    order = np.argsort(s, kind="stable")
+    offsets = np.zeros(V + 1, dtype=np.int64)
+    np.cumsum(np.bincount(s, minlength=V), out=offsets[1:])
+    return offsets, t[order], None if w is None else w[order]
+
+
+def load_edgelist(
+    path,
+    directed=True,
+    weighted=False,
+    chunksize=1 << 16,
+    delimiter=None,
+    label=str,
+    comment="#",
+    skip=0,
+    frozen=False,
+    encoding="utf-8",
+    report=None,
+):
+    """
+    Reads the edge list into one of the graph classes
+
+    :param: directed, weighted - which of the four graphs to build
+    :param: chunksize - number of lines read (and reported) at once
+    :param: delimiter - column separator, e.g. "," or "\\t"; None
+        splits on any whitespace
+    :param: label - applied to the label columns (e.g. int)
+    :param: comment - lines starting with it are skipped
+    :param: skip - number of leading lines to skip (a header)
+    :param: frozen - return the CSR snapshot instead of the mutable graph
+    :param: report - called as report(rows, rows_per_second) after
+        every chunk
+    """
+    labels, index, sources, targets, weights = _read(
+        path, weighted, chunksize, delimiter, label, comment, skip, encoding, report
+    )
+    V = len(labels)
+    s, t, w = _dedup(sources, targets, weights, V, directed)
+    E = len(s)
+    total_weight = float(w.sum()) if weighted else 0.0
+    offsets, adj, adj_weights = _group(s, t, w, V, directed)
+
+    if frozen:
+        cls = graphs.CSRDirectedGraph if directed else graphs.CSRUndirectedGraph
+        return cls(
+            labels,
+            array("q", offsets.tobytes()),
+            array("q", adj.tobytes()),
+            weights=None if adj_weights is None else array("d", adj_weights.tobytes()),
+            num_edges=E,
+            total_weight=total_weight,
+            index=index,
+        )
+
+    if directed:
+        g = graphs.WeightedDirectedGraph() if weighted else graphs.DirectedGraph()
+    else:
+        g = graphs.WeightedUndirectedGraph() if weighted else graphs.UndirectedGraph()
+
+    offsets = offsets.tolist()
+    adj = list(map(labels.__getitem__, adj.tolist()))
+    for i, v in enumerate(labels):
+        # directed targets are vertices even without outgoing edges
+        # (that is what DirectedGraph.add does)
+        g._src[v] = set(adj[offsets[i] : offsets[i + 1]])
+    g.E = E
+    g.index = graphs.VertexIndex(labels, index)
+
+    if weighted:
+        vs = map(labels.__getitem__, s.tolist())
+        ws = map(labels.__getitem__, t.tolist())
+        keys = zip(vs, ws) if directed else map(g._key, vs, ws)
+        g._weights = dict(zip(keys, w.tolist()))
+        g._total_weight = total_weight
+    return g
@@ -1,14 +1,89 @@
-from collections import defaultdict, deque
+from array import array
+from collections import defaultdict, deque, namedtuple
 
 from cspatterns.datastructures import unionfind
 
+# one edit of a graph as passed to the listeners (and kept in the
+# change-log); op is one of "add", "delete", "update", weight and
+# old_weight are the weights after/before the edit (None for the
+# unweighted graphs or when the edge is not there) and version is
+# the graph version the edit produced
+GraphEdit = namedtuple("GraphEdit", ["op", "v", "w", "weight", "old_weight", "version"])
+
+
+def is_weighted(graph) -> bool:
+    """True if graph.adj() yields (vertex, weight) pairs"""
+    if isinstance(graph, CSRGraph):
+        return graph.weighted
+    return isinstance(graph, WeightedUndirectedGraph) or isinstance(graph, WeightedDirectedGraph)
+
+
+class VertexIndex(object):
+    """
+    Dense int ids of the vertex labels; every graph owns one
+    (graph.index) and the algorithms keep their per-vertex data in
+    flat arrays of len(index), translating labels only on the way
+    in and out.
+
+    An id is assigned when the label shows up for the first time and
+    it never changes -- not even when the vertex loses all its edges
+    and drops out of graph.vertices() -- so the ids may have gaps
+    (ids of such vertices) but they stay valid while the graph grows.
+    For the snapshots the ids are the CSR vertex ids.
+    """
+
+    def __init__(self, labels=None, ids=None):
+        self._labels = [] if labels is None else labels
+        self._ids = {v: i for i, v in enumerate(self._labels)} if ids is None else ids
+
+    def add(self, v) -> int:
+        i = self._ids.get(v, -1)
+        if i == -1:
+            i = self._ids[v] = len(self._labels)
+            self._labels.append(v)
+        return i
+
+    def get(self, v, default=None):
+        """id of the label; default if it is unknown"""
+        return self._ids.get(v, default)
+
+    def id(self, v) -> int:
+        return self._ids[v]
+
+    def label(self, i):
+        return self._labels[i]
+
+    def ids(self, labels):
+        """ids of many labels as an int array"""
+        ids = self._ids
+        return array("l", [ids[v] for v in labels])
+
+    def labels(self, ids=None):
+        """labels of the ids (all of them when None)"""
+        if ids is None:
+            return self._labels
+        labels = self._labels
+        return [labels[i] for i in ids]
+
+    def __len__(self) -> int:
+        return len(self._labels)
+
+    def __contains__(self, v) -> bool:
+        return v in self._ids
+
+
+def _rows(columns):
+    """Edges passed to add_edges/delete_edges: either one iterable of
+    tuples, or parallel columns (sequences or numpy arrays)"""
+    if len(columns) == 1:
+        return columns[0]
+    return zip(*(c.tolist() if hasattr(c, "tolist") else c for c in columns))
+
 
 def postorder_dfs(graph):
     seen = set()
     out = []
-    weighted = isinstance(graph, WeightedUndirectedGraph) or isinstance(
-        graph, WeightedDirectedGraph
-    )
+    weighted = is_weighted(graph)
 
     def dfs(v, graph, out):
         if v in seen:
@@ -33,9 +108,7 @@ def postorder_iter(graph):
     stack = []
     seen = set()
     out = []
-    weighted = isinstance(graph, WeightedDirectedGraph) or isinstance(
-        graph, WeightedUndirectedGraph
-    )
+    weighted = is_weighted(graph)
     for v in graph.vertices():
         if v not in seen:
             stack.append((v, False))
@@ -57,7 +130,144 @@ def postorder_iter(graph):
     return out
 
 
-class DirectedGraph(object):
+def strongly_connected_components(graph):
+    """
+    Tarjan's algorithm; a single DFS (with an explicit stack) that
+    needs no reversed graph. Every vertex gets its pre-order number
+    and the lowest number reachable from its DFS subtree through the
+    vertices still on the component stack ('low'); a vertex whose
+    low equals its own number is the root of a component, which is
+    everything above it on the component stack.
+
+    Extra memory is a few int arrays indexed by the vertex ids.
+
+    @return: list of components (lists of vertices) in topological
+        order (sources first)
+    """
+    weighted = is_weighted(graph)
+    ids = {}
+    labels = []
+    order = array("l")
+    low = array("l")
+    onstack = bytearray()
+    stack = []
+    out = []
+
+    def visit(v):
+        i = len(labels)
+        ids[v] = i
+        labels.append(v)
+        order.append(i)
+        low.append(i)
+        onstack.append(1)
+        stack.append(i)
+        return i
+
+    for s in graph.vertices():
+        if s in ids:
+            continue
+        work = [(visit(s), iter(graph.adj(s)))]
+        while work:
+            v, it = work[-1]
+            for w in it:
+                if weighted:
+                    w = w[0]
+                j = ids.get(w, -1)
+                if j == -1:
+                    work.append((visit(w), iter(graph.adj(w))))
+                    break
+                elif onstack[j] and order[j] < low[v]:
+                    low[v] = order[j]
+            else:
+                # all edges of v explored
+                work.pop()
+                if work and low[v] < low[work[-1][0]]:
+                    low[work[-1][0]] = low[v]
+                if low[v] == order[v]:
+                    component = []
+                    while True:
+                        j = stack.pop()
+                        onstack[j] = 0
+                        component.append(labels[j])
+                        if j == v:
+                            break
+                    out.append(component)
+
+    # tarjan emits the sinks first
+    out.reverse()
+    return out
+
+
+class ObservableGraph(object):
+    """
+    Edit tracking shared by the mutable graphs
+
+        version - bumped by every edit that changed the graph; derived
+                  results can remember it and check if they are stale
+        listeners - called with GraphEdit after every edit
+        change-log - opt-in ring of the last `maxlen` edits (enable_log)
+
+    With no listeners and no log an edit costs a single increment.
+    """
+
+    def _init_tracking(self):
+        self.version = 0
+        self._listeners = []
+        self._log = None
+
+    def subscribe(self, listener):
+        """listener(GraphEdit) is called after every add, delete
+        and update_weight"""
+        self._listeners.append(listener)
+
+    def unsubscribe(self, listener):
+        self._listeners.remove(listener)
+
+    def enable_log(self, maxlen=1024):
+        self._log = deque(maxlen=maxlen)
+
+    def disable_log(self):
+        self._log = None
+
+    def changes_since(self, version):
+        """
+        Edits made after the given version (oldest first); None when
+        they are not known any more (the log is disabled, or the ring
+        has dropped some of them) -- recompute from scratch then
+        """
+        if version == self.version:
+            return []
+        log = self._log
+        if log is None or not log or log[0].version > version + 1:
+            return None
+        return [e for e in log if e.version > version]
+
+    def _notify(self, op, v, w, weight=None, old_weight=None):
+        self.version += 1
+        if self._log is not None or self._listeners:
+            edit = GraphEdit(op, v, w, weight, old_weight, self.version)
+            if self._log is not None:
+                self._log.append(edit)
+            for listener in self._listeners:
+                listener(edit)
+
+    def _batch(self):
+        """List to collect the edits of a bulk operation in; None
+        when nobody is interested in them"""
+        if self._log is not None or self._listeners:
+            return []
+        return None
+
+    def _notify_batch(self, op, edits, count):
+        """edits are (v, w, weight, old_weight) tuples (see _batch)"""
+        if edits is None:
+            self.version += count
+        else:
+            for edit in edits:
+                self._notify(op, *edit)
+
+
+class DirectedGraph(ObservableGraph):
     """
     DG using adjacency list
     """
@@ -65,6 +275,8 @@ class DirectedGraph(object):
     def __init__(self, *edges):
         self._src = defaultdict(set)
         self.E = 0
+        self.index = VertexIndex()
+        self._init_tracking()
         for edge in edges:
             self.add(*edge)
 
@@ -75,24 +287,85 @@ class DirectedGraph(object):
         return v in self._src
 
     def has(self, v, w) -> bool:
-        return v in self._src and self._src[v].get(w, False)
-
-    def add(self, v, w):
-        old_v = len(self._src[v])
-        self._src[v].add(w)
-        self.E += len(self._src[v]) - old_v
-
-        if w not in self._src:
-            self._src[w]
-
-    def delete(self, v, w):
-        x = 0
+        return v in self._src and w in self._src[v]
+
+    def _add(self, v, w) -> bool:
+        """Links the vertices; returns False if the edge was there"""
+        src = self._src
+        if v not in src:
+            self.index.add(v)
+        adj = src[v]
+        new = w not in adj
+        if new:
+            adj.add(w)
+            self.E += 1
+
+        if w not in src:
+            self.index.add(w)
+            src[w]
+        return new
+
+    def _delete(self, v, w) -> bool:
+        """Unlinks the vertices; returns False if there was no edge"""
         if v in self._src and w in self._src[v]:
             self._src[v].remove(w)
             if len(self._src[v]) == 0:
                 del self._src[v]
-            x += 1
-        self.E -= max(min(x, 1), 0)
+            self.E -= 1
+            return True
+        return False
+
+    def add(self, v, w):
+        if self._add(v, w):
+            self._notify("add", v, w)
+
+    def delete(self, v, w):
+        if self._delete(v, w):
+            self._notify("delete", v, w)
+
+    def add_edges(self, *columns):
+        """
+        Adds many edges in one pass; either add_edges(edges) with
+        (v, w) pairs or add_edges(sources, targets) with parallel
+        sequences (or numpy arrays)
+        """
+        src = self._src
+        add_label = self.index.add
+        edits = self._batch()
+        count = 0
+        for v, w in _rows(columns):
+            if v not in src:
+                add_label(v)
+            adj = src[v]
+            if w not in adj:
+                adj.add(w)
+                count += 1
+                if edits is not None:
+                    edits.append((v, w, None, None))
+            if w not in src:
+                add_label(w)
+                src[w]
+        self.E += count
+        self._notify_batch("add", edits, count)
+
+    def delete_edges(self, *columns):
+        """Deletes many edges in one pass (see add_edges); the edges
+        which are not there are skipped"""
+        src = self._src
+        edits = self._batch()
+        count = 0
+        for edge in _rows(columns):
+            v, w = edge[0], edge[1]
+            adj = src.get(v)
+            if adj is not None and w in adj:
+                adj.remove(w)
+                if not adj:
+                    del src[v]
+                count += 1
+                if edits is not None:
+                    edits.append((v, w, None, None))
+        self.E -= count
+        self._notify_batch("delete", edits, count)
 
     def vertices(self) -> object:
         for k in self._src.keys():
@@ -120,6 +393,10 @@ class DirectedGraph(object):
             grev.add(w, v)
         return grev
 
+    def freeze(self):
+        """Returns immutable, array-backed snapshot of the graph"""
+        return CSRGraph.from_graph(self)
+
     def topological_sort(self):
         """Returns items in left-right order;
         so that position of f(v) < f(w). In other
@@ -129,7 +406,7 @@ class DirectedGraph(object):
         while stack:
             yield stack.pop()
 
-    def find_strongly_connected_components(self):
+    def find_strongly_connected_components(self, method="kosaraju"):
         """
         Strongly connected component is basically
         a cycle (any vertex inside SCC can be reached
@@ -193,9 +470,19 @@ class DirectedGraph(object):
         from right.
 
 
+        method="tarjan" finds the same components in one pass without
+        building the reversed graph; see strongly_connected_components().
+        The components come in topological order as well, but the order
+        of the independent components (and of the vertices inside
+        cycles) can differ from Kosaraju's.
+
         @return: List[int, [int, int], ....]
                 the nested list identifies cycles
         """
+        if method == "tarjan":
+            return [c if len(c) > 1 else c[0] for c in strongly_connected_components(self)]
+        elif method != "kosaraju":
+            raise Exception("Unknown method {}".format(method))
 
         # iterator into sink vertices
         sinks = self.reverse().topological_sort()
@@ -203,9 +490,7 @@ class DirectedGraph(object):
         visited = set()  # for when we are finished
         dfs_stack = []
         out = deque()
-        weighted = isinstance(self, WeightedUndirectedGraph) or isinstance(
-            self, WeightedDirectedGraph
-        )
+        weighted = is_weighted(self)
 
         for v in sinks:
             if v not in visited:
@@ -233,6 +518,29 @@ class DirectedGraph(object):
         # print('result', out)
         return list(out)
 
+    def condensation(self):
+        """
+        Collapses every strongly connected component into one vertex
+
+        @return: (dag, component) - DirectedGraph over component ids
+            (numbered in topological order) and map vertex -> component id
+        """
+        dag = DirectedGraph()
+        component = {}
+        for c, members in enumerate(strongly_connected_components(self)):
+            dag._src[c]  # components without edges are vertices too
+            for v in members:
+                component[v] = c
+
+        weighted = is_weighted(self)
+        for v in self.vertices():
+            for w in self.adj(v):
+                if weighted:
+                    w = w[0]
+                if component[v] != component[w]:
+                    dag.add(component[v], component[w])
+        return dag, component
+
 
 class WeightedDirectedGraph(DirectedGraph):
     def __init__(self, *args, **kwargs):
@@ -241,17 +549,73 @@ class WeightedDirectedGraph(DirectedGraph):
         super().__init__(*args, **kwargs)
 
     def add(self, v, w, weight):
-        super().add(v, w)
+        self._add(v, w)
         key = self._key(v, w)
-        self._total_weight = self._total_weight - self._weights.get(key, 0) + weight
+        old_weight = self._weights.get(key)
+        self._total_weight = self._total_weight - (old_weight or 0) + weight
         self._weights[key] = weight
+        self._notify("add", v, w, weight, old_weight)
 
     def delete(self, v, w):
-        super().delete(v, w)
-        key = self._key(v, w)
-        weight = self._weights[key]
-        del self._weights[key]
+        self._delete(v, w)
+        weight = self._weights.pop(self._key(v, w))
         self._total_weight -= weight
+        self._notify("delete", v, w, None, weight)
+
+    def add_edges(self, *columns):
+        """
+        Adds (or re-weights) many edges in one pass; either
+        add_edges(edges) with (v, w, weight) tuples or
+        add_edges(sources, targets, weights) with parallel
+        sequences (or numpy arrays)
+        """
+        src = self._src
+        add_label = self.index.add
+        weights = self._weights
+        edits = self._batch()
+        count = added = 0
+        delta = 0.0
+        for v, w, weight in _rows(columns):
+            if v not in src:
+                add_label(v)
+            adj = src[v]
+            if w not in adj:
+                adj.add(w)
+                added += 1
+            if w not in src:
+                add_label(w)
+                src[w]
+            k = (v, w)
+            old_weight = weights.get(k)
+            weights[k] = weight
+            delta += weight - (old_weight or 0)
+            count += 1
+            if edits is not None:
+                edits.append((v, w, weight, old_weight))
+        self.E += added
+        self._total_weight += delta
+        self._notify_batch("add", edits, count)
+
+    def delete_edges(self, *columns):
+        """Deletes many edges in one pass (see add_edges, the weights
+        are not needed); the edges which are not there are skipped"""
+        weights = self._weights
+        key = self._key
+        edits = self._batch()
+        count = 0
+        delta = 0.0
+        for edge in _rows(columns):
+            v, w = edge[0], edge[1]
+            weight = weights.pop(key(v, w), None)
+            if weight is None:
+                continue
+            self._delete(v, w)
+            delta += weight
+            count += 1
+            if edits is not None:
+                edits.append((v, w, None, weight))
+        self._total_weight -= delta
+        self._notify_batch("delete", edits, count)
 
     def edges(self):
         for v, w in super().edges():
@@ -269,8 +633,10 @@ class WeightedDirectedGraph(DirectedGraph):
         key = self._key(v, w)
         if key not in self._weights:
             raise Exception("The edge {} is not present", key)
-        self._total_weight = self._total_weight - self._weights.get(key, 0) + weight
+        old_weight = self._weights[key]
+        self._total_weight = self._total_weight - old_weight + weight
         self._weights[key] = weight
+        self._notify("update", v, w, weight, old_weight)
 
     def get_weight(self, v, w, default=None) -> float:
         key = self._key(v, w)
@@ -289,7 +655,7 @@ class WeightedDirectedGraph(DirectedGraph):
         return grev
 
 
-class UndirectedGraph(object):
+class UndirectedGraph(ObservableGraph):
     """
     Undirected graph using adjacency list
     """
@@ -297,6 +663,8 @@ class UndirectedGraph(object):
     def __init__(self, *edges):
         self._src = defaultdict(set)
         self.E = 0
+        self.index = VertexIndex()
+        self._init_tracking()
         for edge in edges:
             self.add(*edge)
 
@@ -310,18 +678,24 @@ class UndirectedGraph(object):
         return v in self._src
 
     def has(self, v, w) -> bool:
-        return v in self._src and self._src[v].get(w, False)
-
-    def add(self, v, w):
-        old_v = len(self._src[v])
-        old_w = len(self._src[w])
-
-        self._src[v].add(w)
-        self._src[w].add(v)
-
-        self.E += (len(self._src[v]) - old_v + len(self._src[w]) - old_w) // 2
-
-    def delete(self, v, w):
+        return v in self._src and w in self._src[v]
+
+    def _add(self, v, w) -> bool:
+        """Links the vertices; returns False if the edge was there"""
+        src = self._src
+        if v not in src:
+            self.index.add(v)
+        if w not in src:
+            self.index.add(w)
+        new = w not in src[v]
+        if new:
+            src[v].add(w)
+            src[w].add(v)
+            self.E += 1
+        return new
+
+    def _delete(self, v, w) -> bool:
+        """Unlinks the vertices; returns False if there was no edge"""
         x = 0
         if v in self._src and w in self._src[v]:
             self._src[v].remove(w)
@@ -334,7 +708,54 @@ class UndirectedGraph(object):
                 del self._src[w]
             x += 1
 
-        self.E -= max(min(x, 1), 0)
+        self.E -= min(x, 1)
+        return x > 0
+
+    def add(self, v, w):
+        if self._add(v, w):
+            self._notify("add", v, w)
+
+    def delete(self, v, w):
+        if self._delete(v, w):
+            self._notify("delete", v, w)
+
+    def add_edges(self, *columns):
+        """
+        Adds many edges in one pass; either add_edges(edges) with
+        (v, w) pairs or add_edges(sources, targets) with parallel
+        sequences (or numpy arrays)
+        """
+        src = self._src
+        add_label = self.index.add
+        edits = self._batch()
+        count = 0
+        for v, w in _rows(columns):
+            if v not in src:
+                add_label(v)
+            if w not in src:
+                add_label(w)
+            adj = src[v]
+            if w not in adj:
+                adj.add(w)
+                src[w].add(v)
+                count += 1
+                if edits is not None:
+                    edits.append((v, w, None, None))
+        self.E += count
+        self._notify_batch("add", edits, count)
+
+    def delete_edges(self, *columns):
+        """Deletes many edges in one pass (see add_edges); the edges
+        which are not there are skipped"""
+        edits = self._batch()
+        count = 0
+        for edge in _rows(columns):
+            v, w = edge[0], edge[1]
+            if self._delete(v, w):
+                count += 1
+                if edits is not None:
+                    edits.append((v, w, None, None))
+        self._notify_batch("delete", edits, count)
 
     def vertices(self) -> object:
         if self.E:
@@ -366,14 +787,18 @@ class UndirectedGraph(object):
         else:
             raise StopIteration
 
+    def freeze(self):
+        """Returns immutable, array-backed snapshot of the graph"""
+        return CSRGraph.from_graph(self)
+
     def find_connected_components(self):
-        uf = unionfind.UnionFind(values=self.vertices())
-        for e in self.edges():
-            uf.join(e[0], e[1])
-        uf.compress()
+        ids = self.index.id
+        uf = unionfind.IntUnionFind(len(self.index))
+        uf.join_many((ids(e[0]), ids(e[1])) for e in self.edges())
+        roots = uf.compress()
         ccs = defaultdict(list)
         for e in self.edges():
-            ccs[uf.find(e[0])].append(e)
+            ccs[roots[ids(e[0])]].append(e)
         return list(ccs.values())
 
 
@@ -384,17 +809,73 @@ class WeightedUndirectedGraph(UndirectedGraph):
         super().__init__(*args, **kwargs)
 
     def add(self, v, w, weight):
-        super().add(v, w)
+        self._add(v, w)
         key = self._key(v, w)
-        self._total_weight = self._total_weight - self._weights.get(key, 0) + weight
+        old_weight = self._weights.get(key)
+        self._total_weight = self._total_weight - (old_weight or 0) + weight
         self._weights[key] = weight
+        self._notify("add", v, w, weight, old_weight)
 
     def delete(self, v, w):
-        super().delete(v, w)
-        key = self._key(v, w)
-        weight = self._weights[key]
-        del self._weights[key]
+        self._delete(v, w)
+        weight = self._weights.pop(self._key(v, w))
         self._total_weight -= weight
+        self._notify("delete", v, w, None, weight)
+
+    def add_edges(self, *columns):
+        """
+        Adds (or re-weights) many edges in one pass; either
+        add_edges(edges) with (v, w, weight) tuples or
+        add_edges(sources, targets, weights) with parallel
+        sequences (or numpy arrays)
+        """
+        src = self._src
+        add_label = self.index.add
+        weights = self._weights
+        edits = self._batch()
+        count = added = 0
+        delta = 0.0
+        for v, w, weight in _rows(columns):
+            if v not in src:
+                add_label(v)
+            if w not in src:
+                add_label(w)
+            adj = src[v]
+            if w not in adj:
+                adj.add(w)
+                src[w].add(v)
+                added += 1
+            k = (v, w) if v <= w else (w, v)  # _key, inlined
+            old_weight = weights.get(k)
+            weights[k] = weight
+            delta += weight - (old_weight or 0)
+            count += 1
+            if edits is not None:
+                edits.append((v, w, weight, old_weight))
+        self.E += added
+        self._total_weight += delta
+        self._notify_batch("add", edits, count)
+
+    def delete_edges(self, *columns):
+        """Deletes many edges in one pass (see add_edges, the weights
+        are not needed); the edges which are not there are skipped"""
+        weights = self._weights
+        key = self._key
+        edits = self._batch()
+        count = 0
+        delta = 0.0
+        for edge in _rows(columns):
+            v, w = edge[0], edge[1]
+            weight = weights.pop(key(v, w), None)
+            if weight is None:
+                continue
+            self._delete(v, w)
+            delta += weight
+            count += 1
+            if edits is not None:
+                edits.append((v, w, None, weight))
+        self._total_weight -= delta
+        self._notify_batch("delete", edits, count)
 
     def edges(self):
         for v, w in super().edges():
@@ -412,8 +893,10 @@ class WeightedUndirectedGraph(UndirectedGraph):
         key = self._key(v, w)
         if key not in self._weights:
             raise Exception("The edge {} is not present", key)
-        self._total_weight = self._total_weight - self._weights.get(key, 0) + weight
+        old_weight = self._weights[key]
+        self._total_weight = self._total_weight - old_weight + weight
         self._weights[key] = weight
+        self._notify("update", v, w, weight, old_weight)
 
     def get_weight(self, v, w, default=None) -> float:
         key = self._key(v, w)
@@ -424,3 +907,244 @@ class WeightedUndirectedGraph(UndirectedGraph):
                 raise Exception("The edge {} is not present", key)
             else:
                 return default
+
+
+class CSRGraph(object):
+    """
+    Immutable snapshot of any of the graphs above, kept in the
+    compressed sparse row layout:
+
+        labels[i]   - vertex label of the internal id `i`
+        offsets     - edges of vertex `i` are targets[offsets[i]:offsets[i + 1]]
+        targets     - internal ids of the edge targets
+        weights     - weight of every edge (parallel to targets); or None
+
+    The edge data lives in flat typed arrays instead of sets of
+    python objects, so it takes a fraction of the memory and the
+    iteration doesn't have to build keys and look up weights. The
+    read API is the same as the one of the mutable graphs, so
+    the algorithms can run on the snapshot unchanged.
+
+    Use graph.freeze() to get CSRDirectedGraph or CSRUndirectedGraph
+    (which carry the traversals of their mutable counterparts).
+    """
+
+    directed = True
+
+    def __init__(
+        self, labels, offsets, targets, weights=None, num_edges=None, total_weight=None, index=None
+    ):
+        self._labels = labels
+        self._index = index if index is not None else {v: i for i, v in enumerate(labels)}
+        self.index = VertexIndex(labels, self._index)
+        self._offsets = offsets
+        self._targets = targets
+        self._weights = weights
+        self.weighted = weights is not None
+        self.E = len(targets) if num_edges is None else num_edges
+        if total_weight is None:
+            total_weight = sum(e[2] for e in self.edges()) if self.weighted else 0.0
+        self._total_weight = total_weight
+
+    @staticmethod
+    def from_graph(graph):
+        src = graph._src
+        labels = list(src)
+        index = {v: i for i, v in enumerate(labels)}
+
+        # the mutable graphs drop a vertex from _src once it has no
+        # outgoing edges, even if it is still a target of some edge
+        for adj in src.values():
+            for w in adj:
+                if w not in index:
+                    index[w] = len(labels)
+                    labels.append(w)
+
+        offsets = array("q", [0])
+        targets = array("q")
+        weights = None
+        if is_weighted(graph):
+            weights = array("d")
+            graph_weights = graph._weights
+            key = graph._key
+
+        for v in labels:
+            adj = src.get(v, ())
+            targets.extend(index[w] for w in adj)
+            if weights is not None:
+                weights.extend(graph_weights[key(v, w)] for w in adj)
+            offsets.append(len(targets))
+
+        cls = CSRUndirectedGraph if isinstance(graph, UndirectedGraph) else CSRDirectedGraph
+        return cls(
+            labels,
+            offsets,
+            targets,
+            weights=weights,
+            num_edges=graph.num_edges(),
+            total_weight=graph.total_weight() if weights is not None else 0.0,
+            index=index,
+        )
+
+    def freeze(self):
+        return self
+
+    def has_vertex(self, v) -> bool:
+        return v in self._index
+
+    def has(self, v, w) -> bool:
+        return self._find(v, w) >= 0
+
+    def _find(self, v, w):
+        """Returns position of the edge inside targets; -1 if missing"""
+        i = self._index.get(v, -1)
+        j = self._index.get(w, -1)
+        if i == -1 or j == -1:
+            return -1
+        targets = self._targets
+        for x in range(self._offsets[i], self._offsets[i + 1]):
+            if targets[x] == j:
+                return x
+        return -1
+
+    def vertices(self) -> object:
+        for v in self._labels:
+            yield v
+
+    def edges(self) -> object:
+        labels = self._labels
+        offsets = self._offsets
+        targets = self._targets
+        weights = self._weights
+        directed = self.directed
+
+        for i, v in enumerate(labels):
+            for x in range(offsets[i], offsets[i + 1]):
+                j = targets[x]
+                if directed:
+                    edge = (v, labels[j])
+                elif i <= j:
+                    edge = self._key(v, labels[j])
+                else:
+                    continue
+
+                if weights is None:
+                    yield edge
+                else:
+                    yield edge + (weights[x],)
+
+    def num_vertices(self) -> int:
+        return len(self._labels)
+
+    def num_edges(self) -> int:
+        return self.E
+
+    def adj(self, v) -> object:
+        i = self._index.get(v, -1)
+        if i == -1:
+            return
+        labels = self._labels
+        targets = self._targets
+        weights = self._weights
+        if weights is None:
+            for x in range(self._offsets[i], self._offsets[i + 1]):
+                yield labels[targets[x]]
+        else:
+            for x in range(self._offsets[i], self._offsets[i + 1]):
+                yield (labels[targets[x]], weights[x])
+
+    def total_weight(self) -> float:
+        return self._total_weight
+
+    def edge_arrays(self):
+        """
+        Returns numpy arrays (sources, targets, weights) of internal
+        vertex ids, one entry per edge as reported by edges(); the
+        weights are None for unweighted graphs. Needs numpy.
+        """
+        import numpy as np
+
+        V = len(self._labels)
+        offsets = np.asarray(self._offsets, dtype=np.int64)
+        targets = np.asarray(self._targets, dtype=np.int64)
+        sources = np.repeat(np.arange(V, dtype=np.int64), np.diff(offsets))
+        weights = None
+        if self._weights is not None:
+            weights = np.asarray(self._weights, dtype=np.float64)
+
+        if not self.directed:
+            # both directions are stored, keep the one edges() reports
+            once = sources <= targets
+            sources, targets = sources[once], targets[once]
+            if weights is not None:
+                weights = weights[once]
+        return sources, targets, weights
+
+    def get_weight(self, v, w, default=None) -> float:
+        x = self._find(v, w) if self.weighted else -1
+        if x >= 0:
+            return self._weights[x]
+        if default is None:
+            raise Exception("The edge {} is not present", (v, w))
+        return default
+
+
+class CSRDirectedGraph(CSRGraph):
+    """Snapshot of DirectedGraph / WeightedDirectedGraph"""
+
+    directed = True
+
+    def _key(self, v, w):
+        return (v, w)
+
+    def reverse(self):
+        """Transposes the edges; we keep the vertex ids so that
+        the arrays can be built with a counting sort"""
+        V = len(self._labels)
+        offsets = array("q", [0]) * (V + 1)
+        for j in self._targets:
+            offsets[j + 1] += 1
+        for i in range(V):
+            offsets[i + 1] += offsets[i]
+
+        fill = array("q", offsets)
+        targets = array("q", [0]) * len(self._targets)
+        weights = None if self._weights is None else array("d", [0.0]) * len(self._targets)
+        for i in range(V):
+            for x in range(self._offsets[i], self._offsets[i + 1]):
+                j = self._targets[x]
+                targets[fill[j]] = i
+                if weights is not None:
+                    weights[fill[j]] = self._weights[x]
+                fill[j] += 1
+
+        return CSRDirectedGraph(
+            self._labels,
+            offsets,
+            targets,
+            weights=weights,
+            num_edges=self.E,
+            total_weight=self._total_weight,
+            index=self._index,
+        )
+
+    # the traversals only rely on the read API, so we can borrow them
+    topological_sort = DirectedGraph.topological_sort
+    find_strongly_connected_components = DirectedGraph.find_strongly_connected_components
+    condensation = DirectedGraph.condensation
+
+
+class CSRUndirectedGraph(CSRGraph):
+    """
+    Snapshot of UndirectedGraph / WeightedUndirectedGraph; every edge
+    is stored in both directions (just like the adjacency list does)
+    but edges() reports each of them once.
+
+    Unlike UndirectedGraph.vertices(), which fails on a graph without
+    edges, the snapshot of an empty graph simply has no vertices.
+    """
+
+    directed = False
+
+    _key = UndirectedGraph._key
+    find_connected_components = UndirectedGraph.find_connected_components
@@ -0,0 +1,129 @@
+class IndexedMinPQ(object):
+    """
+    Min priority queue which knows where every key sits inside
+    the heap; so that we can change priority of a key that is
+    already queued (decrease_key) instead of pushing a duplicate.
+
+    It is a d-ary heap kept in two parallel lists (keys, priorities)
+    plus a map key -> position. Keys can be any hashable values.
+
+    push, pop_min, decrease_key: O(d * log_d(N))
+    contains, priority: O(1)
+    """
+
+    def __init__(self, arity=2):
+        if arity < 2:
+            raise Exception("Arity must be at least 2")
+        self._d = arity
+        self._keys = []
+        self._prios = []
+        self._pos = {}
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, key) -> bool:
+        return key in self._pos
+
+    def contains(self, key) -> bool:
+        return key in self._pos
+
+    def priority(self, key):
+        return self._prios[self._pos[key]]
+
+    def push(self, key, priority):
+        if key in self._pos:
+            raise Exception("Key {} is already in the queue".format(key))
+        self._keys.append(key)
+        self._prios.append(priority)
+        self._pos[key] = len(self._keys) - 1
+        self._sift_up(len(self._keys) - 1)
+
+    def decrease_key(self, key, priority):
+        i = self._pos[key]
+        if priority > self._prios[i]:
+            raise Exception("New priority {} of {} is higher".format(priority, key))
+        self._prios[i] = priority
+        self._sift_up(i)
+
+    def push_or_decrease(self, key, priority) -> bool:
+        """Inserts the key, or lowers its priority; returns False
+        when the queued priority was already lower (or equal)"""
+        i = self._pos.get(key, -1)
+        if i == -1:
+            self.push(key, priority)
+            return True
+        if priority < self._prios[i]:
+            self._prios[i] = priority
+            self._sift_up(i)
+            return True
+        return False
+
+    def peek_min(self):
+        if not self._keys:
+            raise IndexError("peek from an empty queue")
+        return self._keys[0], self._prios[0]
+
+    def pop_min(self):
+        if not self._keys:
+            raise IndexError("pop from an empty queue")
+        keys = self._keys
+        prios = self._prios
+        key, priority = keys[0], prios[0]
+
+        last_key = keys.pop()
+        last_prio = prios.pop()
+        del self._pos[key]
+        if keys:
+            keys[0] = last_key
+            prios[0] = last_prio
+            self._pos[last_key] = 0
+            self._sift_down(0)
+        return key, priority
+
+    def _sift_up(self, i):
+        keys = self._keys
+        prios = self._prios
+        pos = self._pos
+        key, priority = keys[i], prios[i]
+
+        # move parents down until we find the place for the item
+        while i > 0:
+            parent = (i - 1) // self._d
+            if prios[parent] <= priority:
+                break
+            keys[i] = keys[parent]
+            prios[i] = prios[parent]
+            pos[keys[i]] = i
+            i = parent
+
+        keys[i] = key
+        prios[i] = priority
+        pos[key] = i
+
+    def _sift_down(self, i):
+        keys = self._keys
+        prios = self._prios
+        pos = self._pos
+        d = self._d
+        n = len(keys)
+        key, priority = keys[i], prios[i]
+
+        while True:
+            first = i * d + 1
+            if first >= n:
+                break
+            best = first
+            for c in range(first + 1, min(first + d, n)):
+                if prios[c] < prios[best]:
+                    best = c
+            if prios[best] >= priority:
+                break
+            keys[i] = keys[best]
+            prios[i] = prios[best]
+            pos[keys[i]] = i
+            i = best
+
+        keys[i] = key
+        prios[i] = priority
+        pos[key] = i
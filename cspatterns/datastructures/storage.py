@@ -0,0 +1,236 @@
+"""
+Binary on-disk format of the graphs, loaded with np.memmap
+
+    header      - magic, format version, flags, label kind, V, E,
+                  number of stored edges, total weight
+    offsets     - int64[V + 1]  \\
+    targets     - int64[nnz]     > the CSR layout of CSRGraph
+    weights     - float64[nnz]  /  (weighted graphs only)
+    labels      - the vertex label table (see below)
+
+Every section starts at a multiple of 8 bytes, little endian.
+
+The label table depends on the labels:
+
+    ints        - int64[V] labels, int64[V] ids sorted by the label
+    strings     - int64[V + 1] offsets into the utf-8 blob, the blob,
+                  int64[V] ids sorted by the label
+    anything    - a pickled list (loaded into memory, other sections
+                  are still mapped)
+
+load() maps the file read-only and returns CSRDirectedGraph or
+CSRUndirectedGraph directly on top of the mapped arrays; nothing is
+copied into python objects, the vertex lookup is a binary search
+over the sorted ids. Processes mapping the same file share the pages
+through the OS page cache, so the memory is paid once per host.
+
+Needs numpy.
+"""
+
+import pickle
+import struct
+
+import numpy as np
+
+from cspatterns.datastructures import graphs
+
+MAGIC = b"CSPG"
+VERSION = 1
+
+DIRECTED = 1
+WEIGHTED = 2
+
+INT_LABELS = 0
+STR_LABELS = 1
+PICKLED_LABELS = 2
+
+# magic, version, flags, label kind, V, E, nnz, total weight
+HEADER = struct.Struct("<4sHHI4xqqqd")
+
+
+def _padding(n):
+    return -n % 8
+
+
+def save(graph, path):
+    """Writes any of the graphs (or a snapshot) to the path"""
+    csr = graph.freeze()
+    labels = csr._labels
+    V = len(labels)
+    flags = (DIRECTED if csr.directed else 0) | (WEIGHTED if csr.weighted else 0)
+
+    if all(type(v) is int for v in labels):
+        kind = INT_LABELS
+        values = np.array(labels, dtype="<i8")
+        sections = [values, np.argsort(values, kind="stable").astype("<i8")]
+    elif all(type(v) is str for v in labels):
+        kind = STR_LABELS
+        encoded = [v.encode("utf-8") for v in labels]
+        offsets = np.zeros(V + 1, dtype="<i8")
+        np.cumsum([len(b) for b in encoded], out=offsets[1:])
+        blob = b"".join(encoded)
+        order = sorted(range(V), key=labels.__getitem__)
+        sections = [offsets, blob, np.array(order, dtype="<i8")]
+    else:
+        kind = PICKLED_LABELS
+        sections = [pickle.dumps(list(labels), protocol=pickle.HIGHEST_PROTOCOL)]
+
+    arrays = [
+        np.asarray(csr._offsets, dtype="<i8"),
+        np.asarray(csr._targets, dtype="<i8"),
+    ]
+    if csr.weighted:
+        arrays.append(np.asarray(csr._weights, dtype="<f8"))
+
+    with open(path, "wb") as f:
+        f.write(
+            HEADER.pack(
+                MAGIC,
+                VERSION,
+                flags,
+                kind,
+                V,
+                csr.num_edges(),
+                len(csr._targets),
+                csr.total_weight(),
+            )
+        )
+        for section in arrays + sections:
+            data = section if isinstance(section, bytes) else section.tobytes()
+            f.write(struct.pack("<q", len(data)))
+            f.write(data)
+            f.write(b"\0" * _padding(len(data)))
+
+
+class IntLabels(object):
+    """Read-only sequence of python ints over a mapped int64 array"""
+
+    def __init__(self, values):
+        self._values = memoryview(values)
+
+    def __len__(self):
+        return len(self._values)
+
+    def __getitem__(self, i):
+        return self._values[i]
+
+    def __iter__(self):
+        return iter(self._values)
+
+
+class StrLabels(object):
+    """Read-only sequence of strings decoded on access from the blob"""
+
+    def __init__(self, offsets, blob):
+        self._offsets = memoryview(offsets)
+        self._blob = blob
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        return bytes(self._blob[self._offsets[i] : self._offsets[i + 1]]).decode("utf-8")
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+
+class SortedIndex(object):
+    """
+    label -> id lookup (the dict API used by CSRGraph); a binary
+    search over the ids sorted by their labels
+    """
+
+    def __init__(self, labels, order):
+        self._labels = labels
+        self._order = memoryview(order)
+
+    def get(self, v, default=None):
+        labels = self._labels
+        order = self._order
+        lo, hi = 0, len(order)
+        try:
+            while lo < hi:
+                mid = (lo + hi) // 2
+                if labels[order[mid]] < v:
+                    lo = mid + 1
+                else:
+                    hi = mid
+        except TypeError:  # v can't be compared with the labels
+            return default
+        if lo < len(order) and labels[order[lo]] == v:
+            return order[lo]
+        return default
+
+    def __contains__(self, v):
+        return self.get(v) is not None
+
+    def __getitem__(self, v):
+        i = self.get(v)
+        if i is None:
+            raise KeyError(v)
+        return i
+
+    def __len__(self):
+        return len(self._order)
+
+
+def load(path):
+    """
+    Maps the file written by save(); returns read-only CSRDirectedGraph
+    or CSRUndirectedGraph on top of the mapped arrays
+    """
+    mm = np.memmap(path, dtype=np.uint8, mode="r")
+    if len(mm) < HEADER.size:
+        raise Exception("{} is not a graph file".format(path))
+    magic, version, flags, kind, V, E, nnz, total_weight = HEADER.unpack(
+        mm[: HEADER.size].tobytes()
+    )
+    if magic != MAGIC:
+        raise Exception("{} is not a graph file".format(path))
+    if version != VERSION:
+        raise Exception("Unsupported graph file version {}".format(version))
+
+    pos = HEADER.size
+
+    def section(dtype=None):
+        nonlocal pos
+        (size,) = struct.unpack("<q", mm[pos : pos + 8].tobytes())
+        data = mm[pos + 8 : pos + 8 + size]
+        pos += 8 + size + _padding(size)
+        return data if dtype is None else data.view(dtype)
+
+    offsets = section("<i8")
+    targets = section("<i8")
+    weights = section("<f8") if flags & WEIGHTED else None
+    if len(offsets) != V + 1 or len(targets) != nnz:
+        raise Exception("{} is truncated or corrupted".format(path))
+
+    if kind == INT_LABELS:
+        labels = IntLabels(section("<i8"))
+        index = SortedIndex(labels, section("<i8"))
+    elif kind == STR_LABELS:
+        label_offsets = section("<i8")
+        labels = StrLabels(label_offsets, section())
+        index = SortedIndex(labels, section("<i8"))
+    elif kind == PICKLED_LABELS:
+        labels = pickle.loads(section().tobytes())
+        index = None
+    else:
+        raise Exception("Unknown label kind {}".format(kind))
+
+    cls = graphs.CSRDirectedGraph if flags & DIRECTED else graphs.CSRUndirectedGraph
+    return cls(
+        labels,
+        memoryview(offsets),
+        memoryview(targets),
+        weights=None if weights is None else memoryview(weights),
+        num_edges=E,
+        total_weight=total_weight,
+        index=index,
+    )
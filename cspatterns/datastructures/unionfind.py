@@ -1,47 +1,46 @@
+from array import array
 from collections import defaultdict
 
 
-class UnionFind(object):
-    """Impl of UnionFind with O(logN) find operation;
-    we are keeping track of the size of the underlying
-    branches; making them balanced. This class can use
-    any values for a key (internally is mapped to ints)
-    but we are doing no compression. Maybe later..."""
+class IntUnionFind(object):
+    """UnionFind over ints 0..n-1 (no label map); the parents and
+    sizes live in flat arrays, we join by size and halve the paths
+    on every find (each visited node is pointed to its grandparent),
+    which gives practically constant time operations"""
 
-    def __init__(self, values=None):
-        self._map = defaultdict(int)
-        self._data = []
-        self._size = []
-        self._num_components = 0
+    def __init__(self, n=0):
+        self._data = array("l", range(n))
+        self._size = array("l", [1]) * n
+        self._num_components = n
 
-        if values:
-            for v in values:
-                self.get_key(v)
-        # print(self._map, self._data, self._size, self._num_components)
-
-    def get_key(self, v):
-        key = self._map.get(v, len(self._map))
-        if key == len(self._data):
-            self._data.append(key)
-            self._map[v] = key
-            self._size.append(1)
-            self._num_components += 1
+    def add(self) -> int:
+        """Adds a new singleton; returns its id"""
+        key = len(self._data)
+        self._data.append(key)
+        self._size.append(1)
+        self._num_components += 1
         return key
 
-    def find(self, v):
-        parent = self.get_key(v)
+    def _key(self, v):
+        return v
+
+    def _root(self, key):
         data = self._data
+        while data[key] != key:
+            data[key] = data[data[key]]
+            key = data[key]
+        return key
 
-        while data[parent] != parent:
-            parent = data[parent]
-        return parent
+    def find(self, v):
+        return self._root(self._key(v))
 
-    def join(self, v, w):
-        parentv = self.find(v)
-        parentw = self.find(w)
+    def join(self, v, w) -> bool:
+        """Returns False if they were already connected"""
+        parentv = self._root(self._key(v))
+        parentw = self._root(self._key(w))
 
         if parentv == parentw:
-            return
+            return False
 
         # connect the smaller to the bigger - that way
         # we are making sure that the tree height is
@@ -54,6 +53,16 @@ class UnionFind(object):
         self._data[parentv] = parentw
         self._size[parentw] += self._size[parentv]
         self._num_components -= 1
+        return True
+
+    def join_many(self, pairs) -> int:
+        """Joins every pair; returns the number of merges"""
+        join = self.join
+        return sum(1 for v, w in pairs if join(v, w))
+
+    def find_many(self, keys):
+        find = self.find
+        return array("l", (find(k) for k in keys))
 
     def is_connected(self, v, w):
         return self.find(v) == self.find(w)
@@ -66,7 +75,32 @@ class UnionFind(object):
         return len(self._data)
 
     def compress(self):
-        for i, v in enumerate(self._data):
-            p = self.find(v)
-            self._data[i] = p
+        """Points every element directly to its root"""
+        for i in range(len(self._data)):
+            self._data[i] = self._root(i)
         return self._data
+
+
+class UnionFind(IntUnionFind):
+    """Impl of UnionFind with (practically) constant time find
+    operation; we are keeping track of the size of the underlying
+    branches, making them balanced, and compress the paths. This
+    class can use any values for a key (internally is mapped to ints);
+    use IntUnionFind directly when the keys are ints already."""
+
+    def __init__(self, values=None):
+        super().__init__()
+        self._map = defaultdict(int)
+
+        if values:
+            for v in values:
+                self.get_key(v)
+
+    def get_key(self, v):
+        key = self._map.get(v, -1)
+        if key == -1:
+            key = self.add()
+            self._map[v] = key
+        return key
+
+    _key = get_key
@@ -0,0 +1,130 @@
+"""
+Cache-blocked (tiled) Floyd-Warshall
+
+The plain version touches the whole VxV matrix for every `k`, so
+for large graphs nothing stays in the CPU cache. The blocked version
+walks the matrix in BxB tiles; for every diagonal block `kb`:
+
+    phase 1: the diagonal tile (kb, kb) - depends only on itself
+    phase 2: tiles in the row kb and in the column kb - they need
+             the diagonal tile (finished in phase 1)
+    phase 3: all remaining tiles - they need the row/column tiles
+             (finished in phase 2)
+
+Tiles within phase 2 and within phase 3 are independent, so they
+can be handed over to a pool of processes. The matrices live in
+`multiprocessing.shared_memory` so that the workers update them
+in place (nothing gets pickled except for the tile coordinates).
+
+Needs numpy.
+"""
+
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+# worker side cache of the attached shared memory blocks
+_attached = {}
+
+
+def relax_tile(dp, nxt, kb, ib, jb):
+    """Relaxes tile (ib, jb) through all `k` of the block kb;
+    each argument is a (start, end) range"""
+    i0, i1 = ib
+    j0, j1 = jb
+    tile = dp[i0:i1, j0:j1]
+    ntile = nxt[i0:i1, j0:j1]
+    for k in range(*kb):
+        candidate = dp[i0:i1, k, None] + dp[k, j0:j1]
+        improved = candidate < tile
+        np.minimum(tile, candidate, out=tile)
+        np.copyto(ntile, nxt[i0:i1, k, None].copy(), where=improved)
+
+
+def _attach(name, shape, dtype, untrack):
+    if name not in _attached:
+        shm = shared_memory.SharedMemory(name=name)
+        # the parent owns (and unlinks) the block; a spawned worker has
+        # its own resource tracker which would try to clean it up as well
+        # (forked workers share the tracker of the parent)
+        if untrack:
+            resource_tracker.unregister(shm._name, "shared_memory")
+        _attached[name] = (shm, np.ndarray(shape, dtype=dtype, buffer=shm.buf))
+    return _attached[name][1]
+
+
+def _relax_shared(dp_name, nxt_name, V, tiles, untrack):
+    dp = _attach(dp_name, (V, V), np.float64, untrack)
+    nxt = _attach(nxt_name, (V, V), np.int64, untrack)
+    for kb, ib, jb in tiles:
+        relax_tile(dp, nxt, kb, ib, jb)
+    return len(tiles)
+
+
+def _phases(V, block_size):
+    blocks = [(b, min(b + block_size, V)) for b in range(0, V, block_size)]
+    for kb in blocks:
+        yield [(kb, kb, kb)]
+        yield [(kb, kb, jb) for jb in blocks if jb != kb] + [
+            (kb, ib, kb) for ib in blocks if ib != kb
+        ]
+        yield [(kb, ib, jb) for ib in blocks if ib != kb for jb in blocks if jb != kb]
+
+
+def blocked_floyd_warshall(dp, nxt, block_size=256, workers=1):
+    """
+    Runs the tiled Floyd-Warshall in place
+
+    :param: dp - VxV float64 matrix of distances (inf for missing edges)
+    :param: nxt - VxV int64 matrix of next hops
+    :param: workers - number of processes; 1 runs everything
+        in the current process
+    """
+    V = dp.shape[0]
+    if workers is None or workers > 1:
+        return _blocked_parallel(dp, nxt, block_size, workers)
+
+    for tiles in _phases(V, block_size):
+        for kb, ib, jb in tiles:
+            relax_tile(dp, nxt, kb, ib, jb)
+    return dp, nxt
+
+
+def _blocked_parallel(dp, nxt, block_size, workers):
+    V = dp.shape[0]
+    dp_shm = shared_memory.SharedMemory(create=True, size=max(dp.nbytes, 1))
+    nxt_shm = shared_memory.SharedMemory(create=True, size=max(nxt.nbytes, 1))
+    try:
+        sdp = np.ndarray(dp.shape, dtype=np.float64, buffer=dp_shm.buf)
+        snxt = np.ndarray(nxt.shape, dtype=np.int64, buffer=nxt_shm.buf)
+        sdp[:] = dp
+        snxt[:] = nxt
+
+        chunks = workers or os.cpu_count() or 1
+        untrack = multiprocessing.get_start_method() != "fork"
+        with ProcessPoolExecutor(max_workers=chunks) as pool:
+            for tiles in _phases(V, block_size):
+                if len(tiles) == 1:
+                    kb, ib, jb = tiles[0]
+                    relax_tile(sdp, snxt, kb, ib, jb)
+                    continue
+                batches = [tiles[i::chunks] for i in range(min(chunks, len(tiles)))]
+                futures = [
+                    pool.submit(_relax_shared, dp_shm.name, nxt_shm.name, V, batch, untrack)
+                    for batch in batches
+                ]
+                for f in futures:
+                    f.result()
+
+        dp[:] = sdp
+        nxt[:] = snxt
+        del sdp, snxt
+    finally:
+        dp_shm.close()
+        dp_shm.unlink()
+        nxt_shm.close()
+        nxt_shm.unlink()
+    return dp, nxt
@@ -1,46 +1,77 @@
-from collections import defaultdict, deque
+import os
+from array import array
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from cspatterns.datastructures import graphs
+from cspatterns.greedy.shortest_path import DijkstraShortestPath, ShortestPaths, _search_arrays
 
 
 class Floyd(object):
     """
     All pairs shortest paths with negative weights allowed
-    (but no negative cycles)
+    (but no negative cycles; those raise exception)
 
     time: O(V^3)
-    space: O(V^2) -- with high constant; as we are keeping 2*V
-           with just mappings from vertex labels back to internal
-           ints (dp); which sucks
+    space: O(V^2) -- with high constant; we keep the distances
+           and the next hop of every path (v->w); the rows and columns
+           are the ids of graph.index
+
+    backend:
+        python - triple loop over lists of lists
+        numpy - every `k` step is one broadcasted minimum over
+                float64 matrix; results are the same as from the python
+                version but it scales to thousands of vertices
+                (needs numpy installed)
+        blocked - the numpy matrix processed in `block_size` tiles
+                (cache friendly); with workers > 1 (or None = all cpus)
+                the independent tiles are relaxed by a process pool
+                over shared memory; see floyd_blocked
     """
 
-    def __init__(self, graph) -> None:
+    def __init__(self, graph, backend="python", block_size=256, workers=1) -> None:
         super().__init__()
         self.graph = graph
-        self._find_shortest_paths()
+        self.backend = backend
+        self.block_size = block_size
+        self.workers = workers
+
+        if backend == "python":
+            self._find_shortest_paths()
+        elif backend == "numpy":
+            self._find_shortest_paths_numpy()
+        elif backend == "blocked":
+            self._find_shortest_paths_blocked()
+        else:
+            raise Exception("Unknown backend {}".format(backend))
+
+        if any(self._distances[v][v] < 0 for v in range(len(self._distances))):
+            raise NegativeCycleError()
+
+    def _map_vertices(self):
+        # the graph can contain arbitrary labels (not only ints), the
+        # matrices are indexed by the ids the graph gave them; vertices
+        # that lost all their edges keep their ids (and empty rows)
+        self._index = self.graph.index
+        self._first = next(iter(self.graph.vertices()), None) if self.graph.num_edges() else None
+        return len(self._index), self._index
 
     def _find_shortest_paths(self):
 
-        # the graph can contain arbitrary labels (not only ints)
-        # and since some of them could have been deleted we can't
-        # rely on the internal int representation; we could have
-        # used map directly - but this will be somewhat better for
-        # large graphs (maybe)
-        V = 0
-        dmap = {}
-        imap = {}
-        for v in self.graph.vertices():
-            dmap[v] = V
-            imap[V] = v
-            V += 1
+        V, index = self._map_vertices()
+        dmap = index.id
 
         dp = [[float("inf")] * V for _ in range(V)]
-        parent = list(range(V))
+        nxt = [[-1] * V for _ in range(V)]  # next hop on the path v->w
 
         for v in range(V):
             dp[v][v] = 0
+            nxt[v][v] = v
 
         for v, w, weight in self.graph.edges():
-            dp[dmap[v]][dmap[w]] = weight
-            parent[dmap[w]] = parent[dmap[v]]
+            iv, iw = dmap(v), dmap(w)
+            dp[iv][iw] = weight
+            nxt[iv][iw] = iw
 
         for k in range(V):
             for v in range(V):
@@ -50,69 +81,159 @@ class Floyd(object):
                     weight = dp[v][k] + dp[k][w]
                     if weight < dp[v][w]:
                         dp[v][w] = weight
-                        parent[w] = k
+                        nxt[v][w] = nxt[v][k]
 
-        self._v2imap = dmap
-        self._i2vmap = imap
-        self._parent = parent
+        self._next = nxt
+        self._distances = dp
+
+    def _numpy_matrices(self):
+        import numpy as np
+
+        V, index = self._map_vertices()
+        dmap = index.id
+
+        dp = np.full((V, V), np.inf)
+        nxt = np.full((V, V), -1, dtype=np.int64)
+
+        np.fill_diagonal(dp, 0.0)
+        np.fill_diagonal(nxt, np.arange(V))
+
+        for v, w, weight in self.graph.edges():
+            iv, iw = dmap(v), dmap(w)
+            dp[iv, iw] = weight
+            nxt[iv, iw] = iw
+        return dp, nxt
+
+    def _find_shortest_paths_numpy(self):
+        import numpy as np
+
+        dp, nxt = self._numpy_matrices()
+
+        # the python loop updates the matrix in place; but the row
+        # and the column of `k` cannot change during the step `k`
+        # unless dp[k][k] < 0 -- so until we enter a negative cycle
+        # relaxing the whole matrix at once gives the same result
+        for k in range(dp.shape[0]):
+            if dp[k, k] < 0:
+                break
+            candidate = dp[:, k, None] + dp[k]
+            improved = candidate < dp
+            np.minimum(dp, candidate, out=dp)
+            np.copyto(nxt, nxt[:, k, None].copy(), where=improved)
+
+        self._next = nxt
+        self._distances = dp
+
+    def _find_shortest_paths_blocked(self):
+        from cspatterns.dp import floyd_blocked
+
+        dp, nxt = self._numpy_matrices()
+        floyd_blocked.blocked_floyd_warshall(dp, nxt, self.block_size, self.workers)
+
+        self._next = nxt
         self._distances = dp
 
     def get_distance_between(self, v, w):
-        iv = self._v2imap.get(v, -1)
-        iw = self._v2imap.get(w, -1)
+        iv = self._index.get(v, -1)
+        iw = self._index.get(w, -1)
         if iw == -1 or iv == -1:
             return None  # one of the vertices is not from the graph
-        return self._distances[iv][iw]
+        if self.backend == "python":
+            return self._distances[iv][iw]
+        return float(self._distances[iv, iw])
 
     def get_path_between(self, v, w):
         d = self.get_distance_between(v, w)
         if d is None or d == float("inf"):
             return []
 
-        out = deque()
-        i2vmap = self._i2vmap
-        iv = self._v2imap[v]
-        t = self._v2imap[w]
-        while t != self._parent[t] and t != iv:
-            out.appendleft(i2vmap[t])
-            t = self._parent[t]
-        out.appendleft(v)
-        return list(out)
+        out = [v]
+        label = self._index.label
+        iv = self._index.id(v)
+        t = self._index.id(w)
+        # no negative cycles, so the path can't be longer than V
+        for _ in range(len(self._index)):
+            if iv == t:
+                break
+            iv = int(self._next[iv][t])
+            out.append(label(iv))
+        return out
 
     def get_path_to(self, w):
-        if not self.graph.has_vertex(w):
+        """Path from the first vertex of the graph to `w`"""
+        if not self.graph.has_vertex(w) or self._first is None:
             return []
+        return self.get_path_between(self._first, w)
 
-        out = deque()
-        t = self._v2imap[w]
-        i2vmap = self._i2vmap
 
-        while t != self._parent[t]:
-            out.appendleft(i2vmap[t])
-            t = self._parent[t]
-        out.appendleft(i2vmap[t])
-        return list(out)
+class NegativeCycleError(Exception):
+    """Raised when shortest paths are undefined; `cycle` holds the
+    vertices of one negative cycle in the order of its edges"""
+
+    def __init__(self, cycle=None):
+        msg = "The graph contains a negative cycle"
+        super().__init__(msg if cycle is None else "{}: {}".format(msg, cycle))
+        self.cycle = cycle
+
+
+def _extract_cycle(index, parent, v, V):
+    """
+    Walks the parent ids (-1 terminates) from a vertex that kept
+    relaxing for too long; after V steps we must be inside the cycle
+    """
+    for _ in range(V):
+        v = parent[v]
+        if v == -1:
+            return None
+    cycle = [v]
+    x = parent[v]
+    while x != v:
+        if x == -1 or len(cycle) > V:
+            return None
+        cycle.append(x)
+        x = parent[x]
+    cycle.reverse()
+    return index.labels(cycle)
 
 
 class BellmannFord(object):
     """
     Find single source shortest path to every vertex in the
     graph. We allow negative weights, but negative cycles will raise
-    exception (positive cycle will not cause it). Negative cycle
+    NegativeCycleError (positive cycle will not cause it). Negative cycle
     means we'd enter into a loop that we can't exit.
 
+    All the backends run over the ids of graph.index and keep the
+    result in ShortestPaths (self.paths).
+
     time: O(E*V)
+
+    backend:
+        python - V passes over all edges (stops early once stable)
+        queue - SPFA; only edges out of the vertices whose distance
+                improved are relaxed again; same worst case but on
+                sparse graphs it usually touches a fraction of the edges
+        numpy - the graph is converted once into edge arrays and every
+                pass is a vectorized relaxation (needs numpy)
     """
 
-    def __init__(self, graph, source) -> None:
+    def __init__(self, graph, source, backend="python") -> None:
         super().__init__()
         self.source = source
         self.graph = graph
+        self.backend = backend
 
         if not graph.has_vertex(source):
             raise Exception("Source vertex {} is missing from the graph".format(source))
 
-        self._find_shortest_paths()
+        if backend == "python":
+            self._find_shortest_paths()
+        elif backend == "queue":
+            self._find_shortest_paths_queue()
+        elif backend == "numpy":
+            self._find_shortest_paths_numpy()
+        else:
+            raise Exception("Unknown backend {}".format(backend))
 
     def _find_shortest_paths(self):
         """
@@ -124,33 +245,120 @@ class BellmannFord(object):
         vertices and the distances have not stabilized, then
         we know there must exist a negative cycle (somewhere)
         """
+        index = self.graph.index
+        dst_to, parent = _search_arrays(index, self.source)
 
-        # have to use dict because the graph can contain arbitrary vertices
-        # otherwise we'd have to force them to be ints
-        dst_to = defaultdict(lambda: float("inf"))
-        dst_to[self.source] = 0
-        parent = {self.source: None}
+        # the edges are translated to ids once, not in every pass
+        sources, targets, weights = array("q"), array("q"), array("d")
+        for v, w, weight in self.graph.edges():
+            sources.append(index.id(v))
+            targets.append(index.id(w))
+            weights.append(weight)
+        V = 0
 
         for _ in self.graph.vertices():
             # WRONG! we must run the cycle V times (ONE MORE TIME than necessary)
             # if we were to successfuly detect every negative cycle
             # if _ == self.source:
             #    continue
+            V += 1
             stabilized = True
-            for v, w, weight in self.graph.edges():
+            for v, w, weight in zip(sources, targets, weights):
                 if dst_to[v] + weight < dst_to[w]:
                     dst_to[w] = dst_to[v] + weight
                     stabilized = False
                     parent[w] = v
+                    last = w
 
             if stabilized:  # we can terminate early
                 break
 
         if not stabilized:
-            raise Exception("The graph contains a negative cycle")
+            raise NegativeCycleError(_extract_cycle(index, parent, last, V))
+
+        self.paths = ShortestPaths(index, dst_to, parent)
 
-        self._dst_to = dst_to
-        self._parent = parent
+    def _find_shortest_paths_queue(self):
+        """
+        Queue driven relaxation (SPFA). A vertex goes to the queue
+        only when its distance improved. We also count the edges on
+        the current path to every vertex; a path with V edges must
+        repeat a vertex -- and it can only be shorter than the
+        V-1 edge paths if that loop is negative.
+        """
+        V = self.graph.num_vertices()
+        index = self.graph.index
+        vid, label = index.id, index.label
+        dst_to, parent = _search_arrays(index, self.source)
+        length = array("q", [0]) * len(index)
+
+        s = vid(self.source)
+        queue = deque([s])
+        queued = bytearray(len(index))
+        queued[s] = 1
+
+        while queue:
+            v = queue.popleft()
+            queued[v] = 0
+            dv = dst_to[v]
+            for w, weight in self.graph.adj(label(v)):
+                w = vid(w)
+                if dv + weight < dst_to[w]:
+                    dst_to[w] = dv + weight
+                    parent[w] = v
+                    length[w] = length[v] + 1
+                    if length[w] >= V:
+                        raise NegativeCycleError(_extract_cycle(index, parent, w, V))
+                    if not queued[w]:
+                        queue.append(w)
+                        queued[w] = 1
+
+        self.paths = ShortestPaths(index, dst_to, parent)
+
+    def _find_shortest_paths_numpy(self):
+        """
+        Every pass relaxes all edges at once from the distances of the
+        previous pass; after `i` passes we have (at least) the shortest
+        paths with `i` edges, so V passes still decide about the
+        negative cycle the same way as the python loop does.
+        """
+        import numpy as np
+
+        csr = self.graph.freeze()
+        sources, targets, weights = csr.edge_arrays()
+        V = len(csr.index)
+
+        dst_to = np.full(V, np.inf)
+        dst_to[csr.index.id(self.source)] = 0.0
+        parent = np.full(V, -1, dtype=np.int64)
+
+        stabilized = True
+        for i in range(2 * V):
+            candidate = dst_to[sources] + weights
+            better = candidate < dst_to[targets]
+            if not better.any():
+                stabilized = True
+                break
+            stabilized = False
+            np.minimum.at(dst_to, targets[better], candidate[better])
+            # the edges which produced the new minimum are the parents
+            tight = better & (candidate == dst_to[targets])
+            parent[targets[tight]] = sources[tight]
+
+            if i >= V - 1:
+                # a negative cycle shows up in the parent links (eventually)
+                links = parent.tolist()
+                for v in targets[tight].tolist():
+                    cycle = _extract_cycle(csr.index, links, v, V)
+                    if cycle:
+                        raise NegativeCycleError(cycle)
+
+        if not stabilized:
+            raise NegativeCycleError()
+
+        self.paths = ShortestPaths(
+            csr.index, array("d", dst_to.tobytes()), array("q", parent.tobytes())
+        )
 
     def get_distance_to(self, target):
         """
@@ -158,16 +366,122 @@ class BellmannFord(object):
         If target is not found or there is no path between source
         and the target, we'll return float('inf')
         """
-        return self._dst_to.get(target, float("inf"))
+        return self.paths.get_distance_to(target)
+
+    def distances_to(self, targets):
+        """Distances to many targets at once, as array('d')"""
+        return self.paths.distances_to(targets)
 
     def get_path_to(self, target):
-        if target not in self._parent:
-            return []
+        """Returns [source, ..., target]; or [] when unreachable"""
+        return self.paths.get_path_to(target)
+
+
+# the reweighted graph of Johnson's algorithm; shipped once per worker
+_johnson_graph = None
+
+
+def _johnson_init(graph):
+    global _johnson_graph
+    _johnson_graph = graph
 
-        out = deque()
-        t = target
-        while t is not None and t in self._parent:
-            out.appendleft(t)
-            t = self._parent[t]
 
-        return list(out)
+def _johnson_run(sources):
+    """(source, distance array, parent array) over the ids of
+    the reweighted graph; the arrays pickle compactly"""
+    out = []
+    for s in sources:
+        paths = DijkstraShortestPath(_johnson_graph, s).paths
+        out.append((s, paths._dist, paths._parent))
+    return out
+
+
+class Johnson(object):
+    """
+    All pairs shortest paths for sparse directed graphs; negative
+    weights are allowed (negative cycles raise NegativeCycleError)
+
+    We add a virtual vertex `q` with 0-weight edges to every vertex and
+    run BellmannFord from it; h(v) = d(q, v). Edges reweighted to
+    w(v, x) + h(v) - h(x) are never negative (triangle inequality) and
+    keep the shortest paths, so we can run Dijkstra from every source.
+    The distances are translated back when asked for.
+
+    time: O(V*E + V*E*logV) -- beats Floyd's O(V^3) when E << V^2
+    space: O(V^2) for the results; 16 bytes per pair (ShortestPaths)
+
+    :param: workers - sources are distributed over a pool of processes
+        (None = all cpus); the reweighted graph is sent once per worker
+    """
+
+    def __init__(self, graph, workers=1) -> None:
+        super().__init__()
+        self.graph = graph
+        self.workers = workers
+        self._find_shortest_paths()
+
+    def _find_shortest_paths(self):
+        q = object()  # can't collide with any vertex of the graph
+        augmented = graphs.WeightedDirectedGraph()
+        for v, w, weight in self.graph.edges():
+            augmented.add(v, w, weight)
+        for v in self.graph.vertices():
+            augmented.add(q, v, 0)
+
+        bf = BellmannFord(augmented, q, backend="queue")
+        h = {v: bf.get_distance_to(v) for v in self.graph.vertices()}
+
+        reweighted = graphs.WeightedDirectedGraph()
+        for v, w, weight in self.graph.edges():
+            # clamp the rounding noise of float weights
+            reweighted.add(v, w, max(0, weight + h[v] - h[w]))
+
+        sources = list(self.graph.vertices())
+        self._h = h
+        self._first = sources[0] if sources else None
+        self._paths = {}
+
+        # vertices without any edge only reach themselves
+        for s in sources:
+            if not reweighted.has_vertex(s):
+                index = graphs.VertexIndex([s])
+                self._paths[s] = ShortestPaths(index, *_search_arrays(index, s))
+        sources = [s for s in sources if reweighted.has_vertex(s)]
+
+        workers = self.workers or os.cpu_count() or 1
+        if workers == 1 or len(sources) < 2:
+            _johnson_init(reweighted)
+            try:
+                results = [_johnson_run(sources)]
+            finally:
+                _johnson_init(None)
+        else:
+            with ProcessPoolExecutor(
+                max_workers=workers, initializer=_johnson_init, initargs=(reweighted,)
+            ) as pool:
+                chunks = 4 * workers
+                results = pool.map(_johnson_run, [sources[i::chunks] for i in range(chunks)])
+                results = list(results)
+
+        for chunk in results:
+            for s, dst_to, parent in chunk:
+                self._paths[s] = ShortestPaths(reweighted.index, dst_to, parent)
+
+    def get_distance_between(self, v, w):
+        if v not in self._paths or w not in self._paths:
+            return None  # one of the vertices is not from the graph
+        d = self._paths[v].get_distance_to(w)
+        if d == float("inf"):
+            return d
+        return d - self._h[v] + self._h[w]
+
+    def get_path_between(self, v, w):
+        if v not in self._paths:
+            return []
+        return self._paths[v].get_path_to(w)
+
+    def get_path_to(self, w):
+        """Path from the first vertex of the graph to `w`"""
+        if self._first is None or not self.graph.has_vertex(w):
+            return []
+        return self.get_path_between(self._first, w)
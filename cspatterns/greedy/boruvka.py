@@ -0,0 +1,144 @@
+"""
+Vectorized Borůvka over int edge arrays
+
+Every round each component picks its cheapest outgoing edge and
+all the picked edges are added to the forest at once; the number
+of components at least halves, so there are at most log(V) rounds.
+One round is a group-min over the edge arrays:
+
+    - cs, ct = component of the edge endpoints (internal edges,
+      cs == ct, are dropped for good)
+    - best_w[c] = min weight over the edges touching component c
+    - best_e[c] = min edge id among the edges of weight best_w[c]
+
+Ordering the edges by (weight, edge id) makes all of them distinct,
+so the picked edges can't close a cycle even with equal weights.
+The picked edges are then contracted through IntUnionFind.
+
+The group-min is independent for every slice of the edges, so with
+workers > 1 the edge arrays are shipped once to a pool of processes
+and every round only the component labels go over the wire; the
+partial minimums are merged in the parent.
+
+Needs numpy.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from cspatterns.datastructures import unionfind
+
+NO_EDGE = np.iinfo(np.int64).max
+
+# worker side copy of the edge arrays; shipped once per worker
+_edges = None
+
+
+def cheapest_edges(comp, sources, targets, weights, ids):
+    """
+    :param: comp - component of every vertex
+    :param: sources, targets, weights, ids - the edges (ids are the
+        positions inside the full edge arrays)
+    @return: (best_w, best_e, crossing) - weight and id of the cheapest
+        edge leaving every component (inf/NO_EDGE if there is none) and
+        the mask of the edges that still connect two components
+    """
+    V = len(comp)
+    cs = comp[sources]
+    ct = comp[targets]
+    crossing = cs != ct
+    cs, ct = cs[crossing], ct[crossing]
+    weights, ids = weights[crossing], ids[crossing]
+
+    best_w = np.full(V, np.inf)
+    np.minimum.at(best_w, cs, weights)
+    np.minimum.at(best_w, ct, weights)
+
+    best_e = np.full(V, NO_EDGE, dtype=np.int64)
+    for c in (cs, ct):
+        tied = weights == best_w[c]
+        np.minimum.at(best_e, c[tied], ids[tied])
+    return best_w, best_e, crossing
+
+
+def _boruvka_init(sources, targets, weights):
+    global _edges
+    _edges = (sources, targets, weights)
+
+
+def _boruvka_run(comp, lo, hi):
+    sources, targets, weights = _edges
+    ids = np.arange(lo, hi, dtype=np.int64)
+    best_w, best_e, _ = cheapest_edges(
+        comp, sources[lo:hi], targets[lo:hi], weights[lo:hi], ids
+    )
+    return best_w, best_e
+
+
+def _merge(partials):
+    best_w, best_e = partials[0]
+    for w, e in partials[1:]:
+        better = (w < best_w) | ((w == best_w) & (e < best_e))
+        best_w = np.where(better, w, best_w)
+        best_e = np.where(better, e, best_e)
+    return best_w, best_e
+
+
+def boruvka_rounds(sources, targets, weights, num_vertices, workers=1):
+    """
+    Minimum spanning forest of the edges; a generator yielding
+    (num_components, edge ids added in the round) after every round
+
+    :param: workers - the edges are split into slices handled by
+        a pool of processes (None = all cpus)
+    """
+    sources = np.asarray(sources, dtype=np.int64)
+    targets = np.asarray(targets, dtype=np.int64)
+    weights = np.asarray(weights, dtype=np.float64)
+    E = len(sources)
+
+    union = unionfind.IntUnionFind(num_vertices)
+    comp = np.arange(num_vertices, dtype=np.int64)
+
+    workers = workers or os.cpu_count() or 1
+    pool = None
+    if workers > 1 and E > workers:
+        pool = ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_boruvka_init,
+            initargs=(sources, targets, weights),
+        )
+        bounds = [E * i // workers for i in range(workers + 1)]
+    else:
+        # single process; the internal edges are dropped every round
+        ids = np.arange(E, dtype=np.int64)
+        s, t, w = sources, targets, weights
+
+    try:
+        while True:
+            if pool is not None:
+                futures = [
+                    pool.submit(_boruvka_run, comp, lo, hi)
+                    for lo, hi in zip(bounds, bounds[1:])
+                ]
+                best_w, best_e = _merge([f.result() for f in futures])
+            else:
+                best_w, best_e, crossing = cheapest_edges(comp, s, t, w, ids)
+                s, t, w, ids = s[crossing], t[crossing], w[crossing], ids[crossing]
+
+            picked = np.unique(best_e[best_e != NO_EDGE])
+            if not len(picked):
+                break
+
+            added = [
+                e
+                for e, v, x in zip(picked.tolist(), sources[picked].tolist(), targets[picked].tolist())
+                if union.join(v, x)
+            ]
+            comp = np.array(union.compress(), dtype=np.int64)
+            yield union.num_components(), added
+    finally:
+        if pool is not None:
+            pool.shutdown()
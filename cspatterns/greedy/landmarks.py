@@ -0,0 +1,129 @@
+import pickle
+import random
+from array import array
+
+from cspatterns.greedy.shortest_path import DijkstraShortestPath
+
+INF = float("inf")
+
+
+class LandmarkIndex(object):
+    """
+    ALT (A*, Landmarks, Triangle inequality) preprocessing
+
+    We pick a handful of landmarks and remember the distances from
+    (and, for directed graphs, to) every landmark. Thanks to the
+    triangle inequality, for any landmark L:
+
+        d(v, t) >= d(L, t) - d(L, v)
+        d(v, t) >= d(v, L) - d(t, L)
+
+    which gives A* an admissible (and consistent) lower bound; see
+    heuristic(). The graph must not have negative weights and it
+    should not change after the index was built (rebuild it then).
+
+    Distances are kept as one array('d') per landmark, indexed by
+    the internal vertex id.
+
+    strategy:
+        farthest - every next landmark is the vertex farthest away
+                   from the already selected ones (good coverage)
+        random - sample of the vertices
+    """
+
+    def __init__(self, graph=None, num_landmarks=8, strategy="farthest", seed=None) -> None:
+        super().__init__()
+        self._labels = []
+        self._index = {}
+        self.landmarks = []
+        self._from = []  # d(L, v)
+        self._to = []  # d(v, L); empty for undirected graphs
+
+        if graph is not None:
+            self._build(graph, num_landmarks, strategy, random.Random(seed))
+
+    def _build(self, graph, num_landmarks, strategy, rnd):
+        self._labels = list(graph.vertices())
+        self._index = {v: i for i, v in enumerate(self._labels)}
+        num_landmarks = min(num_landmarks, len(self._labels))
+        reverse = graph.reverse() if hasattr(graph, "reverse") else None
+
+        if strategy == "random":
+            selected = rnd.sample(self._labels, num_landmarks)
+        elif strategy == "farthest":
+            selected = [rnd.choice(self._labels)] if num_landmarks else []
+        else:
+            raise Exception("Unknown strategy {}".format(strategy))
+
+        # min distance of every vertex to the selected landmarks
+        closest = array("d", [INF]) * len(self._labels)
+        while selected:
+            landmark = selected.pop(0)
+            self.landmarks.append(landmark)
+            fwd = self._distances(graph, landmark)
+            self._from.append(fwd)
+            if reverse is not None:
+                self._to.append(self._distances(reverse, landmark))
+
+            if strategy == "farthest" and len(self.landmarks) < num_landmarks:
+                for i, d in enumerate(fwd):
+                    if d < closest[i]:
+                        closest[i] = d
+                # unreachable vertices are the farthest of all
+                candidates = [
+                    (d, i) for i, d in enumerate(closest) if self._labels[i] not in self.landmarks
+                ]
+                if candidates:
+                    selected.append(self._labels[max(candidates)[1]])
+
+    def _distances(self, graph, landmark):
+        return DijkstraShortestPath(graph, landmark).distances_to(self._labels)
+
+    def num_landmarks(self) -> int:
+        return len(self.landmarks)
+
+    def heuristic(self, v, target):
+        """Lower bound of d(v, target); usable as AStarShortestPath heuristic"""
+        i = self._index.get(v, -1)
+        j = self._index.get(target, -1)
+        if i == -1 or j == -1:
+            return 0
+
+        best = 0
+        for fwd in self._from:
+            if fwd[i] != INF and fwd[j] != INF and fwd[j] - fwd[i] > best:
+                best = fwd[j] - fwd[i]
+        # undirected graphs: d(v, L) == d(L, v), so the bound is symmetric
+        for bwd in self._to or self._from:
+            if bwd[i] != INF and bwd[j] != INF and bwd[i] - bwd[j] > best:
+                best = bwd[i] - bwd[j]
+        return best
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            pickle.dump(
+                {
+                    "version": 1,
+                    "labels": self._labels,
+                    "landmarks": self.landmarks,
+                    "from": [a.tobytes() for a in self._from],
+                    "to": [a.tobytes() for a in self._to],
+                },
+                f,
+                protocol=pickle.HIGHEST_PROTOCOL,
+            )
+
+    @staticmethod
+    def load(path):
+        with open(path, "rb") as f:
+            data = pickle.load(f)
+        if data.get("version") != 1:
+            raise Exception("Unsupported landmark index version {}".format(data.get("version")))
+
+        index = LandmarkIndex()
+        index._labels = data["labels"]
+        index._index = {v: i for i, v in enumerate(index._labels)}
+        index.landmarks = data["landmarks"]
+        index._from = [array("d", b) for b in data["from"]]
+        index._to = [array("d", b) for b in data["to"]]
+        return index
@@ -1,20 +1,26 @@
 import heapq
-from collections import defaultdict
+import math
+from collections import deque
 
-from cspatterns.datastructures import graphs, unionfind
+from cspatterns.datastructures import graphs, priorityqueue, unionfind
 
 
 class MST(object):
     def __init__(self, graph: graphs.WeightedUndirectedGraph):
         self.graph = graph
         self.mst = None
+        self._version = None
 
     def extract(self):
-        if self.mst:
+        # the cached tree is good as long as the graph wasn't edited
+        # (snapshots have no version, they can't change)
+        version = getattr(self.graph, "version", None)
+        if self.mst and version == self._version:
             return self.mst
         for _, mst in self.iter():
             pass
         self.mst = mst
+        self._version = version
         return mst
 
 
@@ -23,25 +29,87 @@ class BoruvkaMST(MST):
     I was thinking about growing the MST in a similar fashion
     to Kruskal's but rather than by adding minimum edges, by
     adding minimum edges that would grow existing (or new) MSTs
-    and it turns out, this is what Boruvka's algorithm is doing;
-    which gives me hope it is correct"""
+    and it turns out, this is what Boruvka's algorithm is doing.
+
+    Every round all the components pick their cheapest outgoing
+    edge at once (see cspatterns.greedy.boruvka; needs numpy), so
+    there are at most log(V) rounds over the edge arrays instead
+    of E heap pops.
+
+    O(E logV)
+
+    :param: workers - every round is split over a pool of processes
+        (None = all cpus)
+    """
+
+    def __init__(self, graph: graphs.WeightedUndirectedGraph, workers=1):
+        super().__init__(graph)
+        self.workers = workers
 
     def iter(self):
-        mst_tree = defaultdict(unionfind.UnionFind())
-        pq = []
-        for v, w, weight in self.graph.edges():
-            pq.append((weight, v, w))
-        heapq.heapify(pq)
+        from cspatterns.greedy import boruvka
 
-        while pq:
-            weight, v, w = heapq.heappop(pq)
-            if v not in mst_tree:
-                mst_tree[v].join(v, w)
-            else:
-                uf = mst_tree[v]
-                if uf.is_connected(v, w):
-                    uf.join(v, w)
-                    yield mst_tree
+        snapshot = self.graph.freeze()
+        labels = snapshot._labels
+        sources, targets, weights = snapshot.edge_arrays()
+        mst = graphs.WeightedUndirectedGraph()
+        num_components = snapshot.num_vertices()
+
+        for num_components, added in boruvka.boruvka_rounds(
+            sources, targets, weights, len(labels), self.workers
+        ):
+            for e in added:
+                mst.add(labels[sources[e]], labels[targets[e]], float(weights[e]))
+            yield num_components, mst
+
+        yield num_components, mst
+
+
+# filter-Kruskal sorts the edge sets smaller than this directly
+FILTER_THRESHOLD = 4096
+
+
+def _sorted_edges(sources, targets, weights, union):
+    """All the edge ids ordered by (weight, id), in one chunk"""
+    import numpy as np
+
+    yield np.argsort(weights, kind="stable")
+
+
+def _filter_edges(sources, targets, weights, union):
+    """
+    Filter-Kruskal: yields chunks of edge ids ordered by (weight, id)
+
+    The edges are split around the median weight; the light half goes
+    first and by the time we get to the heavy half, the edges inside
+    the already connected components are filtered out (vectorized
+    find over the union arrays) without ever being sorted. The caller
+    usually has the tree before the heaviest edges are reached.
+    """
+    import numpy as np
+
+    stack = [(np.arange(len(weights), dtype=np.int64), False)]
+    while stack:
+        ids, heavy = stack.pop()
+        if heavy:
+            roots = np.array(union._data, dtype=np.int64)
+            while True:
+                grandparent = roots[roots]
+                if np.array_equal(grandparent, roots):
+                    break
+                roots = grandparent
+            ids = ids[roots[sources[ids]] != roots[targets[ids]]]
+
+        w = weights[ids]
+        if len(ids) > FILTER_THRESHOLD:
+            pivot = np.median(w)
+            light = w <= pivot
+            if not light.all():
+                stack.append((ids[~light], True))
+                stack.append((ids[light], False))
+                continue
+        # ids are ascending, so the stable sort keeps the (weight, id) order
+        yield ids[np.argsort(w, kind="stable")]
 
 
 class KruskalMST(MST):
@@ -51,28 +119,68 @@ class KruskalMST(MST):
 
     We are using UnionFind to identify connected
     components
+
+    mode:
+        heap - heap of (weight, v, w) tuples
+        sorted - edge arrays of the CSR snapshot sorted with
+                 one argsort; the union works over int arrays
+                 (needs numpy)
+        filter - filter-Kruskal over the edge arrays; edges that
+                 can't enter the tree are dropped before they
+                 get sorted (needs numpy)
     """
 
+    def __init__(self, graph: graphs.WeightedUndirectedGraph, mode="heap"):
+        super().__init__(graph)
+        if mode not in ("heap", "sorted", "filter"):
+            raise Exception("Unknown mode {}".format(mode))
+        self.mode = mode
+
     def iter(self) -> graphs.WeightedUndirectedGraph:
+        if self.mode != "heap":
+            yield from self._iter_arrays()
+            return
 
         pq = []
         for v, w, weight in self.graph.edges():
             pq.append((weight, v, w))
         heapq.heapify(pq)
 
-        union = unionfind.UnionFind()
+        # the union works over the vertex ids of the graph; the ids
+        # of the vertices which lost all their edges are not counted
+        ids = self.graph.index.id
+        union = unionfind.IntUnionFind(len(self.graph.index))
+        gone = len(self.graph.index) - self.graph.num_vertices()
         mst = graphs.WeightedUndirectedGraph()
 
-        # populate the union with vertices
-        for v in self.graph.vertices():
-            union.get_key(v)
-
         while pq and mst.num_edges() < self.graph.num_vertices() - 1:
             weight, v, w = heapq.heappop(pq)
-            if not union.is_connected(v, w):
-                union.join(v, w)
+            if union.join(ids(v), ids(w)):
                 mst.add(v, w, weight)
-                yield union.num_components(), mst
+                yield union.num_components() - gone, mst
+
+        yield union.num_components() - gone, mst
+
+    def _iter_arrays(self):
+        snapshot = self.graph.freeze()
+        labels = snapshot._labels
+        sources, targets, weights = snapshot.edge_arrays()
+        union = unionfind.IntUnionFind(len(labels))
+        mst = graphs.WeightedUndirectedGraph()
+        limit = len(labels) - 1
+
+        order = _sorted_edges if self.mode == "sorted" else _filter_edges
+        for chunk in order(sources, targets, weights, union):
+            if mst.num_edges() >= limit:
+                break
+            for v, w, weight in zip(
+                sources[chunk].tolist(), targets[chunk].tolist(), weights[chunk].tolist()
+            ):
+                if union.join(v, w):
+                    mst.add(labels[v], labels[w], weight)
+                    yield union.num_components(), mst
+                    if mst.num_edges() >= limit:
+                        break
 
         yield union.num_components(), mst
 
@@ -85,34 +193,240 @@ class PrimMST(MST):
     working with vertices. After the first vertex is
     examined, it is marked as visited - not to be seen again
 
-    Time: O(ElogE) - E dominates with setting/getting minimum
-    Space: E
+    This is the eager variant: every vertex outside of the tree
+    sits in the queue at most once, keyed by its lightest edge
+    to the tree (lowered with decrease_key), so the queue never
+    holds more than V entries.
+
+    When the tree can't grow any more, the next untouched vertex
+    starts a new one; a disconnected graph gets a minimum spanning
+    forest. iter() yields (number of trees, mst).
+
+    mode:
+        heap - IndexedMinPQ; Time: O(ElogV) Space: V
+        dense - no queue at all: the next vertex is the argmin of
+                the key array, O(V^2) (needs numpy); which beats
+                the heap when the graph is dense
+        auto - dense if E*logV > V^2 (and numpy is around)
     """
 
+    def __init__(self, graph: graphs.WeightedUndirectedGraph, mode="auto"):
+        super().__init__(graph)
+        if mode not in ("auto", "heap", "dense"):
+            raise Exception("Unknown mode {}".format(mode))
+        self.mode = mode
+
+    def _choose_mode(self):
+        if self.mode != "auto":
+            return self.mode
+        V = self.graph.num_vertices()
+        if V < 2 or self.graph.num_edges() * math.log2(V) <= V * V:
+            return "heap"
+        try:
+            import numpy  # noqa: F401
+        except ImportError:
+            return "heap"
+        return "dense"
+
     def iter(self) -> graphs.WeightedUndirectedGraph:
-        heap = []
-        mst = graphs.WeightedUndirectedGraph()
+        if not self.graph.num_edges():
+            yield 0, graphs.WeightedUndirectedGraph()
+        elif self._choose_mode() == "dense":
+            yield from self._iter_dense()
+        else:
+            yield from self._iter_heap()
+
+    def _iter_heap(self):
         g = self.graph
+        mst = graphs.WeightedUndirectedGraph()
+        pq = priorityqueue.IndexedMinPQ()
+        edge_to = {}
         seen = set()
+        trees = 0
+
+        for root in g.vertices():
+            if root in seen:
+                continue
+            trees += 1
+            pq.push(root, 0)
+
+            # keep growing the tree using the closest vertices first
+            while pq:
+                v, _ = pq.pop_min()
+                seen.add(v)
+                if v in edge_to:
+                    w, weight = edge_to.pop(v)
+                    mst.add(w, v, weight)
+                    yield trees, mst
+                for w, weight in g.adj(v):
+                    if w not in seen and pq.push_or_decrease(w, weight):
+                        edge_to[w] = (v, weight)
+
+        yield trees, mst
+
+    def _iter_dense(self):
+        import numpy as np
+
+        snapshot = self.graph.freeze()
+        labels = snapshot._labels
+        offsets = snapshot._offsets
+        targets = np.asarray(snapshot._targets, dtype=np.int64)
+        weights = np.asarray(snapshot._weights, dtype=np.float64)
+
+        V = len(labels)
+        key = np.full(V, np.inf)
+        edge_to = np.full(V, -1, dtype=np.int64)
+        done = np.zeros(V, dtype=bool)
+        mst = graphs.WeightedUndirectedGraph()
+        trees = 0
+
+        for _ in range(V):
+            v = int(np.argmin(key))
+            if key[v] == np.inf:
+                # nothing reachable from the tree; start a new one
+                v = int(np.argmin(done))
+                trees += 1
+            else:
+                mst.add(labels[edge_to[v]], labels[v], float(key[v]))
+                yield trees, mst
+            done[v] = True
+            key[v] = np.inf  # done vertices are never the argmin
+
+            adj = targets[offsets[v] : offsets[v + 1]]
+            adj_weights = weights[offsets[v] : offsets[v + 1]]
+            closer = ~done[adj] & (adj_weights < key[adj])
+            key[adj[closer]] = adj_weights[closer]
+            edge_to[adj[closer]] = v
+
+        yield trees, mst
+
+
+class DynamicMST(object):
+    """
+    Minimum spanning forest of a WeightedUndirectedGraph which is
+    kept up to date while the graph is edited through this object
+    (add, update_weight, delete), instead of running Kruskal again:
+
+        - new edge, or a non-tree edge got lighter: if it connects two
+          trees it joins them, otherwise it closes a cycle with the tree
+          path between its endpoints and replaces the heaviest edge of
+          that path (if it is lighter) -- O(V)
+        - tree edge got lighter: the tree stays minimal -- O(1)
+        - tree edge got heavier or was deleted: the tree falls apart in
+          two and the lightest graph edge across the cut reconnects it;
+          we scan the edges of the smaller side only -- O(V + E_side)
+        - non-tree edge got heavier or was deleted: nothing changes
+
+    rebuild() recomputes the forest from scratch.
+    """
+
+    def __init__(self, graph: graphs.WeightedUndirectedGraph):
+        self.graph = graph
+        self.rebuild()
+
+    def rebuild(self):
+        if self.graph.num_edges():
+            self.mst = KruskalMST(self.graph).extract()
+        else:
+            self.mst = graphs.WeightedUndirectedGraph()
+        return self.mst
+
+    def extract(self):
+        return self.mst
+
+    def total_weight(self) -> float:
+        return self.mst.total_weight()
+
+    def add(self, v, w, weight):
+        if self.graph.has(v, w):
+            self.update_weight(v, w, weight)
+            return
+        self.graph.add(v, w, weight)
+        self._insert(v, w, weight)
+
+    def update_weight(self, v, w, weight):
+        old = self.graph.get_weight(v, w)
+        self.graph.update_weight(v, w, weight)
+        if self.mst.has(v, w):
+            if weight <= old:
+                self.mst.update_weight(v, w, weight)
+            else:
+                self.mst.delete(v, w)
+                self._reconnect(v, w)
+        elif weight < old:
+            self._insert(v, w, weight)
+
+    def delete(self, v, w):
+        self.graph.delete(v, w)
+        if self.mst.has(v, w):
+            self.mst.delete(v, w)
+            self._reconnect(v, w)
+
+    def _tree_path(self, v, w):
+        """Edges (x, y, weight) of the tree path between v and w;
+        None if they are in different trees"""
+        mst = self.mst
+        if not (mst.has_vertex(v) and mst.has_vertex(w)):
+            return None
+
+        parent = {v: None}
+        queue = deque([v])
+        while queue and w not in parent:
+            x = queue.popleft()
+            for y, weight in mst.adj(x):
+                if y not in parent:
+                    parent[y] = (x, weight)
+                    queue.append(y)
+        if w not in parent:
+            return None
+
+        path = []
+        while parent[w] is not None:
+            x, weight = parent[w]
+            path.append((x, w, weight))
+            w = x
+        return path
+
+    def _insert(self, v, w, weight):
+        if v == w:
+            return
+        path = self._tree_path(v, w)
+        if path is None:
+            self.mst.add(v, w, weight)
+            return
+        x, y, heaviest = max(path, key=lambda e: e[2])
+        if weight < heaviest:
+            self.mst.delete(x, y)
+            self.mst.add(v, w, weight)
+
+    def _smaller_side(self, v, w):
+        """Both halves of the split tree are explored in lockstep;
+        returns the vertices of the one that runs out first"""
+        mst = self.mst
+        sides = ({v}, {w})
+        queues = (deque([v]), deque([w]))
+        while True:
+            for side, queue in zip(sides, queues):
+                if not queue:
+                    return side
+                x = queue.popleft()
+                if mst.has_vertex(x):
+                    for y, _ in mst.adj(x):
+                        if y not in side:
+                            side.add(y)
+                            queue.append(y)
 
-        # we can start from any arbitrary vertex
-        v = list(self.graph.vertices())[0]
-        for w, weight in g.adj(v):
-            heapq.heappush(heap, (weight, v, w))
-        seen.add(v)
-
-        # keep growing the tree using the smallest vertices first
-        while len(heap) and mst.num_edges() < self.graph.num_vertices() - 1:
-            edge_weight, v, w = heapq.heappop(heap)
-            if w not in seen:
-                mst.add(v, w, edge_weight)
-                yield 1, mst
-                for ww, weight in g.adj(w):
-                    if ww not in seen:
-                        heapq.heappush(heap, (weight, w, ww))
-                seen.add(w)
-
-        yield 1, mst
+    def _reconnect(self, v, w):
+        side = self._smaller_side(v, w)
+        best = None
+        for x in side:
+            if not self.graph.has_vertex(x):
+                continue
+            for y, weight in self.graph.adj(x):
+                if y not in side and (best is None or weight < best[2]):
+                    best = (x, y, weight)
+        if best is not None:
+            self.mst.add(*best)
 
 
 def test():
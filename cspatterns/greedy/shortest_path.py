@@ -1,16 +1,215 @@
 import heapq
+import math
+from array import array
+from collections import defaultdict, deque
+
+from cspatterns.datastructures.priorityqueue import IndexedMinPQ
+
+
+def _build_path(parent, target):
+    """Follows parent links (None terminates) back from the target"""
+    if target not in parent:
+        return []
+    out = deque()
+    t = target
+    while t is not None:
+        out.appendleft(t)
+        t = parent[t]
+    return list(out)
+
+
+class ShortestPaths(object):
+    """
+    Result of a single source search: the distances and the parents
+    in flat arrays over the ids of graph.index -- array('d') distances
+    (inf when unreachable) and array('q') parent ids (-1 for the source
+    and the unreachable vertices). That is 16 bytes per vertex instead
+    of boxed floats in two dicts; the paths are followed only when
+    asked for.
+
+    Vertices added to the graph after the search are unreachable.
+    """
+
+    def __init__(self, index, dist, parent) -> None:
+        super().__init__()
+        self.index = index
+        self._dist = dist
+        self._parent = parent
+
+    def _id(self, v) -> int:
+        i = self.index.get(v)
+        if i is None or i >= len(self._dist):
+            return -1
+        return i
+
+    def get_distance_to(self, target):
+        """Shortest distance to the target; float('inf') if unreachable"""
+        i = self._id(target)
+        return float("inf") if i == -1 else self._dist[i]
+
+    def distances_to(self, targets):
+        """Distances to many targets at once, as array('d')"""
+        get = self.index.get
+        dist = self._dist
+        V = len(dist)
+        inf = float("inf")
+        return array("d", [inf if i is None or i >= V else dist[i] for i in map(get, targets)])
+
+    def get_parent(self, target):
+        """The vertex before the target on its shortest path; None for
+        the source and the unreachable vertices"""
+        i = self._id(target)
+        if i == -1 or self._parent[i] == -1:
+            return None
+        return self.index.label(self._parent[i])
+
+    def get_path_to(self, target):
+        """Returns [source, ..., target]; or [] when unreachable"""
+        i = self._id(target)
+        if i == -1 or self._dist[i] == float("inf"):
+            return []
+        label = self.index.label
+        parent = self._parent
+        out = deque()
+        while i != -1:
+            out.appendleft(label(i))
+            i = parent[i]
+        return list(out)
+
+    def items(self):
+        """(vertex, distance) of every reachable vertex"""
+        label = self.index.label
+        inf = float("inf")
+        for i, d in enumerate(self._dist):
+            if d != inf:
+                yield label(i), d
+
+
+def _search_arrays(index, source):
+    """Distance and parent arrays of a new search from the source"""
+    dist = array("d", [float("inf")]) * len(index)
+    parent = array("q", [-1]) * len(index)
+    dist[index.id(source)] = 0.0
+    return dist, parent
+
+
+def shortest_path(graph, source, target):
+    """
+    Point to point Dijkstra; stops as soon as the target is settled
+    so only the vertices closer than the target get explored. Nothing
+    is allocated for the rest of the graph.
+
+    @return: (distance, [source, ..., target]); (inf, []) if there
+        is no path
+    """
+    if not graph.has_vertex(source) or not graph.has_vertex(target):
+        return float("inf"), []
+
+    dst_to = {source: 0}
+    parent = {source: None}
+    pq = IndexedMinPQ()
+    pq.push(source, 0)
+
+    while pq:
+        v, curr_weight = pq.pop_min()
+        if v == target:
+            return curr_weight, _build_path(parent, target)
+        for w, edge_weight in graph.adj(v):
+            d = curr_weight + edge_weight
+            if d < dst_to.get(w, float("inf")):
+                dst_to[w] = d
+                parent[w] = v
+                pq.push_or_decrease(w, d)
+    return float("inf"), []
+
+
+def bidirectional_shortest_path(graph, source, target, reverse_graph=None):
+    """
+    Runs Dijkstra from the source (on the graph) and from the target
+    (on the reversed graph) at the same time, always advancing the
+    side with the smaller frontier. Every edge that touches a vertex
+    reached by the other side gives a candidate path; we can stop once
+    the two frontiers together are longer than the best candidate.
+
+    :param: reverse_graph - for directed graphs pass graph.reverse()
+        when running many queries; it is built on every call otherwise.
+        Undirected graphs are their own reverse.
+
+    @return: (distance, [source, ..., target]); (inf, []) if there
+        is no path
+    """
+    if not graph.has_vertex(source) or not graph.has_vertex(target):
+        return float("inf"), []
+    if reverse_graph is None:
+        reverse_graph = graph.reverse() if hasattr(graph, "reverse") else graph
+
+    graphs = (graph, reverse_graph)
+    dst_to = ({source: 0}, {target: 0})
+    parent = ({source: None}, {target: None})
+    queues = (IndexedMinPQ(), IndexedMinPQ())
+    queues[0].push(source, 0)
+    queues[1].push(target, 0)
+
+    best = float("inf") if source != target else 0
+    meet = source
+
+    while queues[0] and queues[1]:
+        if queues[0].peek_min()[1] + queues[1].peek_min()[1] >= best:
+            break
+        side = 0 if queues[0].peek_min()[1] <= queues[1].peek_min()[1] else 1
+        other = 1 - side
+        v, curr_weight = queues[side].pop_min()
+
+        for w, edge_weight in graphs[side].adj(v):
+            d = curr_weight + edge_weight
+            if d < dst_to[side].get(w, float("inf")):
+                dst_to[side][w] = d
+                parent[side][w] = v
+                queues[side].push_or_decrease(w, d)
+            if w in dst_to[other] and d + dst_to[other][w] < best:
+                best = d + dst_to[other][w]
+                meet = w
+
+    if best == float("inf"):
+        return best, []
+
+    # forward half ends in the meeting vertex, backward half starts there
+    path = _build_path(parent[0], meet)
+    t = parent[1][meet]
+    while t is not None:
+        path.append(t)
+        t = parent[1][t]
+    return best, path
 
 
 class DijkstraShortestPath(object):
-    def __init__(self, graph, source) -> None:
+    """
+    Single source shortest paths for non-negative weights
+
+    By default we keep at most one queue entry per vertex (indexed
+    priority queue with decrease_key). With lazy=True we use heapq
+    instead and push duplicates; the stale entries (the vertex was
+    settled with a shorter distance meanwhile) are skipped when popped.
+
+    The search runs over the ids of graph.index; the result is kept
+    in ShortestPaths (self.paths).
+
+    time: O(E logV)
+    """
+
+    def __init__(self, graph, source, lazy=False) -> None:
         super().__init__()
         self.source = source
         self.graph = graph
+        self.lazy = lazy
 
         if not graph.has_vertex(source):
             raise Exception("Source vertex {} is missing from the graph".format(source))
 
-        self._dst_to = self._extract_shortest_distances()
+        if lazy:
+            self.paths = self._extract_shortest_distances_lazy()
+        else:
+            self.paths = self._extract_shortest_distances()
 
     def _extract_shortest_distances(self):
         """
@@ -18,27 +217,160 @@ class DijkstraShortestPath(object):
         negative. We'll happily process those but you cannot expect
         results to be correct.
         """
-        dst_to = {}
-        pq = [(0, self.source)]
         g = self.graph
+        index = g.index
+        vid, label = index.id, index.label
+        dst_to, parent = _search_arrays(index, self.source)
+        pq = IndexedMinPQ()
+        pq.push(vid(self.source), 0)
 
-        for v in g.vertices():
-            dst_to[v] = float("inf")
-        dst_to[self.source] = 0
+        while pq:
+            v, curr_weight = pq.pop_min()
+            for w, edge_weight in g.adj(label(v)):
+                w = vid(w)
+                if curr_weight + edge_weight < dst_to[w]:
+                    dst_to[w] = curr_weight + edge_weight
+                    if dst_to[w] < 0:  # we've entered a negative cycle
+                        raise Exception("Entered a negative cycle, not good")
+                    parent[w] = v
+                    pq.push_or_decrease(w, dst_to[w])
+        return ShortestPaths(index, dst_to, parent)
+
+    def _extract_shortest_distances_lazy(self):
+        g = self.graph
+        index = g.index
+        vid, label = index.id, index.label
+        dst_to, parent = _search_arrays(index, self.source)
+        pq = [(0, vid(self.source))]
 
         while pq:
             curr_weight, v = heapq.heappop(pq)
-            # print('v={} weight={}'.format(v, curr_weight))
-            for w, edge_weight in g.adj(v):
-                if dst_to[v] + edge_weight < dst_to[w]:
-                    # print('dst_to[v]={}, adding w={}'.format(dst_to[v], w))
-                    dst_to[w] = dst_to[v] + edge_weight
+            if curr_weight > dst_to[v]:  # stale entry, v was settled already
+                continue
+            for w, edge_weight in g.adj(label(v)):
+                w = vid(w)
+                if curr_weight + edge_weight < dst_to[w]:
+                    dst_to[w] = curr_weight + edge_weight
                     if dst_to[w] < 0:  # we've entered a negative cycle
                         raise Exception("Entered a negative cycle, not good")
-                    heapq.heappush(
-                        pq, (dst_to[w], w)
-                    )  # TODO: if we had indexed PQ we can replace value for 'w'
-        return dst_to
+                    parent[w] = v
+                    heapq.heappush(pq, (dst_to[w], w))
+        return ShortestPaths(index, dst_to, parent)
+
+    def get_distance_to(self, target):
+        """
+        Return shortest distance from the source to the target
+        If target is not found or there is no path between source
+        and the target, we'll return float('inf')
+        """
+        return self.paths.get_distance_to(target)
+
+    def distances_to(self, targets):
+        """Distances to many targets at once, as array('d')"""
+        return self.paths.distances_to(targets)
+
+    def get_path_to(self, target):
+        """Returns [source, ..., target]; or [] when unreachable"""
+        return self.paths.get_path_to(target)
+
+
+class DynamicShortestPath(object):
+    """
+    Single source shortest paths (non-negative weights) which stay
+    up to date while the WeightedDirectedGraph is edited; we subscribe
+    to the graph and repair only the part of the shortest path tree
+    an edit can touch (Ramalingam-Reps):
+
+        - new edge / lower weight (v, w): if it shortens the way to w,
+          Dijkstra continues from w -- only the vertices which got
+          closer are visited
+        - deleted edge / higher weight of a tree edge (v, w): the
+          subtree of w lost its distances; every vertex of the subtree
+          takes its best incoming edge from outside of the subtree and
+          Dijkstra runs over the subtree only
+        - anything else keeps the tree as it is
+
+    The incoming edges are tracked here, so that the repair doesn't
+    have to scan the whole graph. close() unsubscribes.
+    """
+
+    def __init__(self, graph, source) -> None:
+        super().__init__()
+        self.source = source
+        self.graph = graph
+
+        paths = DijkstraShortestPath(graph, source).paths
+        self._dst_to = dict(paths.items())
+        self._parent = {v: paths.get_parent(v) for v in self._dst_to}
+        self._in = defaultdict(set)
+        for v, w, _ in graph.edges():
+            self._in[w].add(v)
+
+        graph.subscribe(self._on_edit)
+
+    def close(self):
+        self.graph.unsubscribe(self._on_edit)
+
+    def _on_edit(self, edit):
+        v, w, weight, old_weight = edit.v, edit.w, edit.weight, edit.old_weight
+        if edit.op == "delete":
+            self._in[w].discard(v)
+            if self._parent.get(w, w) == v:
+                self._repair(w)
+            return
+
+        self._in[w].add(v)
+        if old_weight is not None and weight > old_weight:
+            if self._parent.get(w, w) == v:
+                self._repair(w)
+        elif v in self._dst_to and self._dst_to[v] + weight < self._dst_to.get(w, float("inf")):
+            self._dst_to[w] = self._dst_to[v] + weight
+            self._parent[w] = v
+            pq = IndexedMinPQ()
+            pq.push(w, self._dst_to[w])
+            self._propagate(pq)
+
+    def _propagate(self, pq):
+        dst_to = self._dst_to
+        g = self.graph
+        while pq:
+            v, curr_weight = pq.pop_min()
+            for w, edge_weight in g.adj(v):
+                if curr_weight + edge_weight < dst_to.get(w, float("inf")):
+                    dst_to[w] = curr_weight + edge_weight
+                    self._parent[w] = v
+                    pq.push_or_decrease(w, dst_to[w])
+
+    def _repair(self, root):
+        dst_to = self._dst_to
+        parent = self._parent
+        g = self.graph
+
+        # the subtree hanging under root
+        affected = {root}
+        stack = [root]
+        while stack:
+            v = stack.pop()
+            for w, _ in g.adj(v):
+                if w not in affected and parent.get(w, w) == v:
+                    affected.add(w)
+                    stack.append(w)
+        for v in affected:
+            del dst_to[v]
+            del parent[v]
+
+        # reconnect to the rest of the tree (its distances are final)
+        pq = IndexedMinPQ()
+        for v in affected:
+            for u in self._in[v]:
+                if u in dst_to and u not in affected:
+                    d = dst_to[u] + g.get_weight(u, v)
+                    if d < dst_to.get(v, float("inf")):
+                        dst_to[v] = d
+                        parent[v] = u
+            if v in dst_to:
+                pq.push(v, dst_to[v])
+        self._propagate(pq)
 
     def get_distance_to(self, target):
         """
@@ -47,3 +379,116 @@ class DijkstraShortestPath(object):
         and the target, we'll return float('inf')
         """
         return self._dst_to.get(target, float("inf"))
+
+    def get_path_to(self, target):
+        """Returns [source, ..., target]; or [] when unreachable"""
+        return _build_path(self._parent, target)
+
+
+def zero_heuristic(v, target):
+    """No guidance at all; A* degrades into Dijkstra"""
+    return 0
+
+
+def euclidean_heuristic(coords):
+    """
+    Straight line distance between the vertices; coords is a map
+    vertex -> (x, y). Admissible as long as no edge is shorter than
+    the distance between its endpoints.
+    """
+
+    def h(v, target):
+        (x1, y1), (x2, y2) = coords[v], coords[target]
+        return math.hypot(x1 - x2, y1 - y2)
+
+    return h
+
+
+def haversine_heuristic(coords, radius=6371.0):
+    """
+    Great circle distance; coords is a map vertex -> (lat, lon)
+    in degrees, the result is in units of the radius (km by default)
+    """
+
+    def h(v, target):
+        lat1, lon1 = map(math.radians, coords[v])
+        lat2, lon2 = map(math.radians, coords[target])
+        a = (
+            math.sin((lat2 - lat1) / 2) ** 2
+            + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+        )
+        return 2 * radius * math.asin(min(1.0, math.sqrt(a)))
+
+    return h
+
+
+class AStarShortestPath(object):
+    """
+    Dijkstra guided towards the target: vertices are taken in the
+    order of dist(source, v) + heuristic(v, target), so the search
+    runs less into directions that lead away from the target. It
+    stops as soon as the target is settled.
+
+    The heuristic must not overestimate the remaining distance
+    (admissible), otherwise the result may not be the shortest path.
+    Vertices are reopened if a shorter path shows up later, so it
+    doesn't have to be consistent.
+
+    Use num_settled() to see how much of the graph was explored.
+    """
+
+    def __init__(self, graph, source, target, heuristic=zero_heuristic) -> None:
+        super().__init__()
+        self.graph = graph
+        self.source = source
+        self.target = target
+        self.heuristic = heuristic
+
+        if not graph.has_vertex(source):
+            raise Exception("Source vertex {} is missing from the graph".format(source))
+
+        self._dst_to = {source: 0}
+        self._parent = {source: None}
+        self._settled = set()
+        self._search()
+
+    def _search(self):
+        g = self.graph
+        h = self.heuristic
+        target = self.target
+        dst_to = self._dst_to
+        parent = self._parent
+        settled = self._settled
+
+        pq = IndexedMinPQ()
+        pq.push(self.source, h(self.source, target))
+
+        while pq:
+            v, _ = pq.pop_min()
+            settled.add(v)
+            if v == target:
+                break
+            for w, edge_weight in g.adj(v):
+                d = dst_to[v] + edge_weight
+                if d < dst_to.get(w, float("inf")):
+                    dst_to[w] = d
+                    parent[w] = v
+                    settled.discard(w)
+                    pq.push_or_decrease(w, d + h(w, target))
+
+    def num_settled(self) -> int:
+        return len(self._settled)
+
+    def get_distance_to(self, target):
+        """
+        Shortest distance from the source; known only for the target
+        (and the vertices settled on the way). float('inf') otherwise
+        """
+        if target not in self._settled:
+            return float("inf")
+        return self._dst_to[target]
+
+    def get_path_to(self, target):
+        if target not in self._settled:
+            return []
+        return _build_path(self._parent, target)
@@ -0,0 +1,98 @@
+"""
+Connected components over int edge arrays (needs numpy)
+
+Instead of walking the edges one by one through UnionFind, we
+label all the vertices at once, Shiloach-Vishkin style:
+
+    - every vertex starts as its own root (parent[v] = v)
+    - hooking: for every edge whose endpoints have different roots,
+      the higher root is hooked under the lower one (when several
+      edges compete, the lowest root wins)
+    - pointer jumping: parent[v] = parent[parent[v]] until every
+      vertex points directly to its root
+
+and repeat until no edge connects two different roots. Each step is
+a handful of vectorized operations over the edge arrays, so the
+python interpreter is out of the inner loop; the number of rounds
+is logarithmic in practice.
+"""
+
+from collections import defaultdict
+
+import numpy as np
+
+
+def label_components(sources, targets, num_vertices):
+    """
+    :param: sources, targets - int arrays of the edge endpoints
+        (vertex ids 0..num_vertices-1)
+    @return: (labels, sizes) - component id of every vertex (ids are
+        dense, ordered by the smallest vertex of the component) and
+        the number of vertices in every component
+    """
+    sources = np.asarray(sources, dtype=np.int64)
+    targets = np.asarray(targets, dtype=np.int64)
+    parent = np.arange(num_vertices, dtype=np.int64)
+
+    while True:
+        ps = parent[sources]
+        pt = parent[targets]
+        crossing = ps != pt
+        if not crossing.any():
+            break
+        ps, pt = ps[crossing], pt[crossing]
+        # hook higher root under the lower one; roots only decrease
+        # so no cycles can be formed
+        np.minimum.at(parent, np.maximum(ps, pt), np.minimum(ps, pt))
+
+        while True:
+            grandparent = parent[parent]
+            if np.array_equal(grandparent, parent):
+                break
+            parent = grandparent
+
+    _, labels, sizes = np.unique(parent, return_inverse=True, return_counts=True)
+    return labels.reshape(-1), sizes
+
+
+class ConnectedComponents(object):
+    """
+    Connected components of an undirected graph (or of its CSR
+    snapshot); the result is a per-vertex label array plus the
+    component sizes. get_components() gives the same list of edge
+    lists as UndirectedGraph.find_connected_components()
+    """
+
+    def __init__(self, graph) -> None:
+        super().__init__()
+        self.graph = graph.freeze()
+        sources, targets, _ = self.graph.edge_arrays()
+        self._labels, self._sizes = label_components(
+            sources, targets, self.graph.num_vertices()
+        )
+
+    def labels(self):
+        """Component id of every vertex, indexed by the vertex position
+        in graph.vertices()"""
+        return self._labels
+
+    def sizes(self):
+        """Number of vertices of every component"""
+        return self._sizes
+
+    def num_components(self) -> int:
+        return len(self._sizes)
+
+    def component_of(self, v):
+        return int(self._labels[self.graph._index[v]])
+
+    def is_connected(self, v, w):
+        return self.component_of(v) == self.component_of(w)
+
+    def get_components(self):
+        index = self.graph._index
+        labels = self._labels
+        ccs = defaultdict(list)
+        for e in self.graph.edges():
+            ccs[labels[index[e[0]]]].append(e)
+        return list(ccs.values())
@@ -1,4 +1,5 @@
 import types
+from array import array
 
 from cspatterns.datastructures import graphs
 
@@ -36,7 +37,7 @@ class IdentifyBridges(object):
         self._graph = graph
 
         # helper func to deal with un/weighted .adj()
-        if isinstance(graph, graphs.UndirectedGraph):
+        if not graphs.is_weighted(graph):
 
             def get_adj(self, v):
                 for w in self._graph.adj(v):
@@ -45,7 +46,7 @@ class IdentifyBridges(object):
         else:
 
             def get_adj(self, v):
-                for w, weight in self._adj(v):
+                for w, weight in self._graph.adj(v):
                     yield (w, weight)
 
         setattr(self, "_adj", types.MethodType(get_adj, self))
@@ -54,53 +55,97 @@ class IdentifyBridges(object):
     def get_bridges(self):
         return self._bridges
 
-    def _run_search(self):
+    def get_articulation_points(self):
+        """Vertices which, when removed, would disconnect the graph"""
+        return self._articulation_points
 
-        bridges = []
+    def get_biconnected_components(self):
+        """Maximal groups of edges that stay connected after removal of
+        any single vertex; a list of edge lists (bridges are alone)"""
+        return self._biconnected_components
 
-        # our vertices can be non-ints, so we need mapping
-        # the iteration over the dictionary is guaranteed stable in python; so we could actually avoid using the vmap
-        # if I do a 2nd pass and map the vid -> vertex key; # the values must not change however
-        # https://stackoverflow.com/questions/2053021/is-the-order-of-a-python-dictionary-guaranteed-over-iterations
-
-        vmap = {}
-        ccount = 0
-        ord = [-1] * self._graph.num_vertices()
-        low = [-1] * self._graph.num_vertices()
-
-        def dfs(v, parent):
-            nonlocal ccount
-            vmap[v] = ccount
-            vid = ccount
-            ord[vid] = ccount
-            low[vid] = ccount
-            ccount += 1
-
-            parentid = ord[vmap[parent]]
-
-            for w, _ in self._adj(v):
-                if w not in vmap:
-                    dfs(w, v)
-                    wid = vmap[w]
-                    if low[wid] < low[vid]:  # backlink, pointing to some of our ancestor
-                        low[vid] = low[wid]
-                elif (
-                    vmap[w] != parentid
-                ):  # these are downlinks - we have already explored the subgraph
-                    wid = vmap[w]
-                    if ord[wid] < ord[vid]:
-                        low[vid] = low[wid]
-
-            if low[vid] == ord[vid] and v != parent:
-                bridges.append((parent, v))
-
-        for v in self._graph.vertices():
-            if v not in vmap:
-                dfs(v, v)
+    def _run_search(self):
+        """
+        DFS with an explicit stack (the graph can be deeper than the
+        recursion limit); `ord` and `low` are int arrays indexed by
+        the vertex ids of graph.index (-1 = not visited yet). For the
+        tree edge parent->v:
+
+        low[v] > ord[parent] - nothing below v reaches parent or above,
+            so the edge is a bridge
+        low[v] >= ord[parent] - parent separates v's subtree from the
+            rest (articulation point, unless it is the root, which is
+            one only with 2+ DFS children); the edges collected since
+            we entered v form a biconnected component
+        """
+        bridges = []
+        articulation_points = []
+        components = []
+
+        index = self._graph.index
+        vmap = index.id
+        labels = index.labels()
+        ord = array("l", [-1]) * len(index)
+        low = array("l", [-1]) * len(index)
+        counter = 0
+        edge_stack = []
+
+        def visit(v):
+            nonlocal counter
+            vid = vmap(v)
+            ord[vid] = low[vid] = counter
+            counter += 1
+            return vid
+
+        for root in self._graph.vertices():
+            if ord[vmap(root)] != -1:
+                continue
+            rootid = visit(root)
+            root_children = 0
+            seen_cut = set()
+            stack = [(rootid, -1, self._adj(root))]
+
+            while stack:
+                vid, parentid, it = stack[-1]
+                for w, _ in it:
+                    wid = vmap(w)
+                    if ord[wid] == -1:  # tree edge, descend
+                        edge_stack.append((labels[vid], w))
+                        if vid == rootid:
+                            root_children += 1
+                        stack.append((visit(w), vid, self._adj(w)))
+                        break
+                    elif wid != parentid and ord[wid] < ord[vid]:
+                        # backlink, pointing to some of our ancestors
+                        edge_stack.append((labels[vid], w))
+                        if ord[wid] < low[vid]:
+                            low[vid] = ord[wid]
+                else:
+                    # v is finished, report to the parent
+                    stack.pop()
+                    if parentid == -1:
+                        continue
+                    if low[vid] < low[parentid]:
+                        low[parentid] = low[vid]
+
+                    if low[vid] > ord[parentid]:
+                        bridges.append((labels[parentid], labels[vid]))
+                    if low[vid] >= ord[parentid]:
+                        if parentid != rootid and parentid not in seen_cut:
+                            seen_cut.add(parentid)
+                            articulation_points.append(labels[parentid])
+                        tree_edge = (labels[parentid], labels[vid])
+                        component = []
+                        while True:
+                            e = edge_stack.pop()
+                            component.append(e)
+                            if e == tree_edge:
+                                break
+                        components.append(component)
+
+            if root_children > 1:
+                articulation_points.append(root)
 
         self._bridges = bridges
-
-        # debugging output
-        # print("vertex \t", "\t".join([str(x) for x in self._graph.vertices()]))
-        # print("ord\t", "\t".join([str(vmap[x]) for x in self._graph.vertices()]))
-        # print("low\t", "\t".join([str(low[vmap[x]]) for x in self._graph.vertices()]))
+        self._articulation_points = articulation_points
+        self._biconnected_components = components
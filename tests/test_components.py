@@ -0,0 +1,36 @@
+import random
+
+from cspatterns.datastructures import graphs, unionfind
+from cspatterns.linear import components
+
+
+def test_label_components():
+    labels, sizes = components.label_components([0, 1, 4, 5], [1, 2, 5, 3], 7)
+    assert list(labels) == [0, 0, 0, 1, 1, 1, 2]
+    assert list(sizes) == [3, 3, 1]
+
+    labels, sizes = components.label_components([], [], 3)
+    assert list(labels) == [0, 1, 2]
+
+
+def test_connected_components():
+    ug = graphs.WeightedUndirectedGraph((5, 6, 1.0), (5, 7, 3.0), (6, 7, 2.0), (1, 2, 0.5))
+    ug.add(3, 4, 3.0)
+    cc = components.ConnectedComponents(ug)
+    assert cc.num_components() == 3
+    assert sorted(cc.sizes()) == [2, 2, 3]
+    assert cc.is_connected(5, 7) and not cc.is_connected(1, 3)
+    assert cc.get_components() == ug.find_connected_components()
+
+    rnd = random.Random("components")
+    ug = graphs.UndirectedGraph()
+    for _ in range(3000):
+        ug.add(rnd.randrange(5000), rnd.randrange(5000))
+
+    cc = components.ConnectedComponents(ug)
+    uf = unionfind.UnionFind(ug.vertices())
+    uf.join_many(ug.edges())
+    assert cc.num_components() == uf.num_components()
+    for v, w in list(ug.edges())[:200]:
+        assert cc.is_connected(v, w)
+    assert cc.get_components() == ug.find_connected_components()
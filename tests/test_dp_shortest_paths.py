@@ -1,7 +1,19 @@
+import random
+
 from cspatterns.datastructures import graphs
 from cspatterns.dp import shortest_path
 
 
+def generate_graph(V, E, seed="floyd", negative=False):
+    rnd = random.Random(seed)
+    dg = graphs.WeightedDirectedGraph()
+    while dg.num_edges() < E:
+        v, w = rnd.randrange(V), rnd.randrange(V)
+        if v != w:
+            dg.add(v, w, rnd.randint(-2 if negative else 0, 20))
+    return dg
+
+
 def test_bellmann_ford():
     dg = graphs.WeightedDirectedGraph(
         ("s", "u", 2),
@@ -18,6 +30,68 @@ def test_bellmann_ford():
     assert sp.get_path_to("t") == ["s", "u", "v", "t"]
     assert sp.get_path_to("x") == []
 
+    sp = shortest_path.BellmannFord(dg.freeze(), "s")
+    assert sp.get_distance_to("t") == 5
+    assert sp.get_path_to("t") == ["s", "u", "v", "t"]
+
+
+def test_bellmann_ford_queue():
+    for seed in ("a", "b", "c"):
+        dg = generate_graph(60, 300, seed=seed)
+        for source in (0, 5):
+            if not dg.has_vertex(source):
+                continue
+            full = shortest_path.BellmannFord(dg, source)
+            for backend in ("queue", "numpy"):
+                other = shortest_path.BellmannFord(dg, source, backend=backend)
+                vertices = list(dg.vertices())
+                assert other.distances_to(vertices) == full.distances_to(vertices)
+                for v in dg.vertices():
+                    assert full.get_distance_to(v) == other.get_distance_to(v)
+                    path = other.get_path_to(v)
+                    if path:
+                        assert path[0] == source and path[-1] == v
+                        assert sum(dg.get_weight(a, b) for a, b in zip(path, path[1:])) == (
+                            other.get_distance_to(v)
+                        )
+
+    # negative weights but no cycles (edges go only to higher vertices)
+    rnd = random.Random("dag")
+    dg = graphs.WeightedDirectedGraph()
+    for _ in range(150):
+        v, w = sorted(rnd.sample(range(30), 2))
+        dg.add(v, w, rnd.randint(-10, 10))
+    expected = shortest_path.Floyd(dg)
+    source = next(iter(dg.vertices()))
+    sp = shortest_path.BellmannFord(dg, source, backend="numpy")
+    for v in dg.vertices():
+        assert sp.get_distance_to(v) == expected.get_distance_between(source, v)
+
+
+def test_bellmann_ford_negative_cycle():
+    dg = graphs.WeightedDirectedGraph(
+        ("s", "a", 1), ("a", "b", 1), ("b", "c", -1), ("c", "a", -1), ("c", "t", 1)
+    )
+    for backend in ("python", "queue", "numpy"):
+        try:
+            shortest_path.BellmannFord(dg, "s", backend=backend)
+            assert False, "negative cycle was not detected"
+        except shortest_path.NegativeCycleError as e:
+            cycle = e.cycle
+            # the cycle can start anywhere, but it follows the edges
+            assert sorted(cycle) == ["a", "b", "c"]
+            edges = list(zip(cycle, cycle[1:] + cycle[:1]))
+            assert sum(dg.get_weight(v, w) for v, w in edges) < 0
+
+    dg = generate_graph(20, 300, seed="neg", negative=True)
+    for backend in ("python", "queue", "numpy"):
+        try:
+            shortest_path.BellmannFord(dg, next(iter(dg.vertices())), backend=backend)
+            assert False, "negative cycle was not detected"
+        except shortest_path.NegativeCycleError as e:
+            edges = list(zip(e.cycle, e.cycle[1:] + e.cycle[:1]))
+            assert sum(dg.get_weight(v, w) for v, w in edges) < 0
+
 
 def test_floyd():
     dg = graphs.WeightedDirectedGraph(
@@ -33,9 +107,121 @@ def test_floyd():
     assert sp.get_distance_between("s", "t") == 5
     assert sp.get_path_between("s", "t") == ["s", "u", "v", "t"]
     assert sp.get_path_between("s", "x") == []
-    print(sp._parent, sp._i2vmap)
     assert sp.get_path_to("t") == ["s", "u", "v", "t"]
 
+    sp = shortest_path.Floyd(dg.freeze())
+    assert sp.get_distance_between("s", "t") == 5
+    assert sp.get_path_between("s", "t") == ["s", "u", "v", "t"]
+
+
+def test_floyd_numpy():
+    dg = generate_graph(40, 200)
+    py = shortest_path.Floyd(dg)
+    fast = shortest_path.Floyd(dg, backend="numpy")
+
+    for v in dg.vertices():
+        assert py.get_path_to(v) == fast.get_path_to(v)
+        for w in dg.vertices():
+            assert py.get_distance_between(v, w) == fast.get_distance_between(v, w)
+            assert py.get_path_between(v, w) == fast.get_path_between(v, w)
+
+    path = py.get_path_between(3, 7)
+    assert sum(dg.get_weight(a, b) for a, b in zip(path, path[1:])) == py.get_distance_between(
+        3, 7
+    )
+    assert type(fast.get_distance_between(3, 7)) is float
+    assert fast.get_distance_between(3, "x") is None
+
+    # without negative cycle the negative weights are fine
+    dg = graphs.WeightedDirectedGraph(("a", "b", 1), ("b", "c", -3), ("a", "c", 1))
+    for backend in ("python", "numpy"):
+        sp = shortest_path.Floyd(dg, backend=backend)
+        assert sp.get_distance_between("a", "c") == -2
+        assert sp.get_path_between("a", "c") == ["a", "b", "c"]
+
+
+def test_floyd_blocked():
+    dg = generate_graph(50, 300, seed="blocked")
+    reference = shortest_path.Floyd(dg, backend="numpy")
+    for workers in (1, 2):
+        blocked = shortest_path.Floyd(dg, backend="blocked", block_size=8, workers=workers)
+        for v in dg.vertices():
+            for w in dg.vertices():
+                d = blocked.get_distance_between(v, w)
+                assert reference.get_distance_between(v, w) == d
+                # ties can be broken differently, but the path must be a shortest one
+                path = blocked.get_path_between(v, w)
+                if d != float("inf"):
+                    assert path[0] == v and path[-1] == w
+                    assert sum(dg.get_weight(a, b) for a, b in zip(path, path[1:])) == d
+
+
+def test_floyd_negative_cycle():
+    cycle = graphs.WeightedDirectedGraph(("a", "b", 1), ("b", "a", -3), ("b", "c", 1))
+    random_negative = generate_graph(30, 120, negative=True)
+    for dg in (cycle, random_negative):
+        for backend in ("python", "numpy", "blocked"):
+            try:
+                shortest_path.Floyd(dg, backend=backend)
+                assert False, "negative cycle was not detected"
+            except Exception as e:
+                assert "negative cycle" in str(e)
+
+
+def test_johnson():
+    # negative weights but no cycles (edges go only to higher vertices)
+    rnd = random.Random("johnson")
+    dg = graphs.WeightedDirectedGraph()
+    for _ in range(120):
+        v, w = sorted(rnd.sample(range(40), 2))
+        dg.add(v, w, rnd.randint(-10, 10))
+    dg.add(39, 0, 100)
+
+    floyd = shortest_path.Floyd(dg)
+    for workers in (1, 2):
+        johnson = shortest_path.Johnson(dg, workers=workers)
+        for v in dg.vertices():
+            for w in dg.vertices():
+                d = johnson.get_distance_between(v, w)
+                assert d == floyd.get_distance_between(v, w)
+                path = johnson.get_path_between(v, w)
+                if d != float("inf"):
+                    assert path[0] == v and path[-1] == w
+                    assert sum(dg.get_weight(a, b) for a, b in zip(path, path[1:])) == d
+                else:
+                    assert path == []
+        assert johnson.get_distance_between(0, "x") is None
+
+    dg = graphs.WeightedDirectedGraph(
+        ("s", "u", 2), ("s", "v", 4), ("u", "v", -1), ("v", "t", 4), ("u", "w", 2), ("w", "t", 2)
+    )
+    johnson = shortest_path.Johnson(dg)
+    assert johnson.get_distance_between("s", "t") == 5
+    assert johnson.get_path_between("s", "t") == ["s", "u", "v", "t"]
+    assert johnson.get_path_to("t") == ["s", "u", "v", "t"]
+
+    dg.add("t", "s", -6)
+    try:
+        shortest_path.Johnson(dg)
+        assert False, "negative cycle was not detected"
+    except shortest_path.NegativeCycleError:
+        pass
+
 
 if __name__ == "__main__":
     test_floyd()
+
+
+def test_floyd_after_delete():
+    dg = graphs.WeightedDirectedGraph(("a", "b", 1), ("b", "c", 2), ("c", "d", 3), ("a", "d", 9))
+    # d drops out of vertices() once its only outgoing edge is gone,
+    # but it is still a target
+    dg.add("d", "e", 1)
+    dg.delete("d", "e")
+    assert not dg.has_vertex("d")
+    for backend in ("python", "numpy"):
+        floyd = shortest_path.Floyd(dg, backend)
+        assert floyd.get_distance_between("a", "d") == 6
+        assert floyd.get_path_between("a", "d") == ["a", "b", "c", "d"]
+        assert floyd.get_path_to("c") == ["a", "b", "c"]
+        assert floyd.get_distance_between("a", "x") is None
@@ -0,0 +1,68 @@
+import gzip
+import os
+import random
+import tempfile
+
+from cspatterns.datastructures import edgelist, graphs
+
+
+def write(path, lines, compress=False):
+    opener = gzip.open if compress else open
+    with opener(path, "wt") as f:
+        f.write("\n".join(lines) + "\n")
+
+
+def test_load_edgelist():
+    rnd = random.Random("edgelist")
+    rows = [(rnd.randrange(50), rnd.randrange(50), rnd.randint(1, 9)) for _ in range(400)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "edges.csv.gz")
+        write(path, ["src,dst,weight"] + ["{},{},{}".format(*r) for r in rows], compress=True)
+
+        for cls, directed in (
+            (graphs.WeightedDirectedGraph, True),
+            (graphs.WeightedUndirectedGraph, False),
+        ):
+            expected = cls()
+            for v, w, weight in rows:
+                expected.add(v, w, float(weight))
+
+            reports = []
+            g = edgelist.load_edgelist(
+                path,
+                directed=directed,
+                weighted=True,
+                chunksize=64,
+                delimiter=",",
+                label=int,
+                skip=1,
+                report=lambda rows, speed: reports.append(rows),
+            )
+            assert type(g) is cls
+            assert reports[-1] == len(rows) and len(reports) == 7
+            assert g.num_edges() == expected.num_edges()
+            assert g.total_weight() == expected.total_weight()
+            assert sorted(g.edges()) == sorted(expected.edges())
+            assert sorted(g.vertices()) == sorted(expected.vertices())
+
+            frozen = edgelist.load_edgelist(
+                path, directed=directed, weighted=True, delimiter=",", label=int, skip=1, frozen=True
+            )
+            assert sorted(frozen.edges()) == sorted(expected.freeze().edges())
+            assert frozen.total_weight() == expected.total_weight()
+            for v in expected.vertices():
+                assert sorted(frozen.adj(v)) == sorted(expected.adj(v))
+
+        path = os.path.join(tmp, "edges.txt")
+        write(path, ["# comment", "a b", "b  c", "", "a b", "c c"])
+        g = edgelist.load_edgelist(path)
+        assert sorted(g.edges()) == [("a", "b"), ("b", "c"), ("c", "c")]
+        assert g.num_edges() == 3
+        g.add("c", "d")
+        g.delete("a", "b")
+        assert g.num_edges() == 3
+
+        g = edgelist.load_edgelist(path, directed=False, frozen=True)
+        assert sorted(g.edges()) == [("a", "b"), ("b", "c"), ("c", "c")]
+        assert sorted(g.adj("c")) == ["b", "c"]
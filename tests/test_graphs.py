@@ -1,5 +1,7 @@
 import random
 
+import numpy
+
 from cspatterns.datastructures import graphs
 
 random.seed("alhambra")
@@ -186,5 +188,194 @@ def test_weighted_undirected():
     ]
 
 
+def test_csr_snapshot():
+    dg = graphs.WeightedDirectedGraph((0, 1, 1.0), (1, 2, 2.0), (2, 3, 3.0), (3, 1, 1.0))
+    dg.add(3, 4, 4.0)
+    csr = dg.freeze()
+
+    assert list(csr.vertices()) == list(dg.vertices())
+    assert list(csr.edges()) == list(dg.edges())
+    assert csr.num_vertices() == 5
+    assert csr.num_edges() == 5
+    assert csr.total_weight() == dg.total_weight()
+    assert sorted(csr.adj(3)) == [(1, 1.0), (4, 4.0)]
+    assert list(csr.adj(99)) == []
+    assert csr.has(3, 4) and not csr.has(4, 3)
+    assert csr.get_weight(2, 3) == 3.0
+    assert csr.get_weight(4, 3, 0.0) == 0.0
+    assert sorted(csr.reverse().edges()) == sorted(dg.reverse().edges())
+
+    assert list(csr.topological_sort()) == list(dg.topological_sort())
+    assert csr.find_strongly_connected_components() == [0, [1, 2, 3], 4]
+
+    ug = graphs.UndirectedGraph((1, 2), (3, 4), (1, 3), (5, 5))
+    csr = ug.freeze()
+    assert list(csr.edges()) == list(ug.edges())
+    assert csr.num_edges() == 4
+    assert sorted(csr.adj(1)) == [2, 3]
+
+    ug = graphs.WeightedUndirectedGraph((5, 6, 1.0), (5, 7, 3.0), (6, 7, 2.0), (1, 2, 0.5))
+    csr = ug.freeze()
+    assert list(csr.edges()) == list(ug.edges())
+    assert csr.total_weight() == 6.5
+    assert csr.find_connected_components() == ug.find_connected_components()
+    assert not hasattr(csr, "find_strongly_connected_components")
+    assert not hasattr(dg.freeze(), "find_connected_components")
+
+
+def test_csr_snapshot_after_delete():
+    # 'a' loses its only outgoing edge but stays a target of ('c', 'a')
+    dg = graphs.DirectedGraph(("a", "b"), ("c", "a"))
+    dg.delete("a", "b")
+    csr = dg.freeze()
+    assert list(csr.edges()) == list(dg.edges()) == [("c", "a")]
+    assert csr.has_vertex("a")
+    assert list(csr.adj("a")) == []
+
+    dg = graphs.WeightedDirectedGraph(("a", "b", 1.0), ("b", "c", 2.0))
+    dg.delete("b", "c")
+    csr = dg.freeze()
+    assert list(csr.edges()) == [("a", "b", 1.0)]
+    assert csr.total_weight() == 1.0
+
+
+def normalize(components):
+    return sorted(sorted(c) if isinstance(c, list) else [c] for c in components)
+
+
+def test_tarjan_scc():
+    dg = graphs.DirectedGraph((0, 1), (1, 2), (2, 3), (3, 1), (3, 4), (4, 5), (5, 6), (6, 7))
+    dg.add(7, 5)
+    dg.add(10, 11)
+    dg.add(0, 10)
+    tarjan = dg.find_strongly_connected_components(method="tarjan")
+    assert normalize(tarjan) == normalize(dg.find_strongly_connected_components())
+    assert tarjan[0] == 0
+
+    edges = list(generate_graph(300, 500).edges())
+    for g in (
+        graphs.DirectedGraph(*edges),
+        graphs.WeightedDirectedGraph(*[(v, w, 1.0) for v, w in edges]),
+    ):
+        tarjan = g.find_strongly_connected_components(method="tarjan")
+        assert normalize(tarjan) == normalize(g.find_strongly_connected_components())
+        assert normalize(g.freeze().find_strongly_connected_components("tarjan")) == normalize(
+            tarjan
+        )
+
+        # components come in topological order
+        dag, component = g.condensation()
+        assert dag.num_vertices() == len(tarjan)
+        for v, w in dag.edges():
+            assert v < w
+        for v, w in edges:
+            assert component[v] <= component[w]
+
+    # deep graph, recursion would not survive this
+    chain = graphs.DirectedGraph(*[(i, i + 1) for i in range(5000)])
+    chain.add(5000, 0)
+    assert len(graphs.strongly_connected_components(chain)) == 1
+
+
 if __name__ == "__main__":
     test_directed_weighted()
+
+
+def test_change_log():
+    for cls, weighted in (
+        (graphs.DirectedGraph, False),
+        (graphs.UndirectedGraph, False),
+        (graphs.WeightedDirectedGraph, True),
+        (graphs.WeightedUndirectedGraph, True),
+    ):
+        g = cls()
+        edits = []
+        g.subscribe(edits.append)
+        g.enable_log(maxlen=3)
+        args = (1.0,) if weighted else ()
+
+        g.add("a", "b", *args)
+        g.add("b", "c", *args)
+        assert g.version == 2
+        if weighted:
+            g.update_weight("a", "b", 2.0)
+            assert edits[-1][:5] == ("update", "a", "b", 2.0, 1.0)
+        else:
+            g.add("a", "b")  # no change, no edit
+            assert g.version == 2
+        g.delete("b", "c")
+        if not weighted:
+            g.delete("x", "y")  # no change, no edit
+        assert [e.version for e in edits] == list(range(1, g.version + 1))
+        assert edits[-1].op == "delete" and edits[-1].old_weight == (1.0 if weighted else None)
+
+        assert g.changes_since(g.version) == []
+        assert g.changes_since(g.version - 2) == edits[-2:]
+        if weighted:
+            assert g.changes_since(0) is None  # dropped from the ring
+        g.unsubscribe(edits.append)
+        g.disable_log()
+        g.add("c", "d", *args)
+        assert len(edits) == g.version - 1
+        assert g.changes_since(g.version - 1) is None
+
+
+def test_bulk_edits():
+    rnd = random.Random("bulk")
+    rows = [(rnd.randrange(40), rnd.randrange(40), float(rnd.randint(1, 9))) for _ in range(300)]
+    gone = rows[::3] + [(100, 101, 1.0)]
+
+    for cls, weighted in (
+        (graphs.DirectedGraph, False),
+        (graphs.UndirectedGraph, False),
+        (graphs.WeightedDirectedGraph, True),
+        (graphs.WeightedUndirectedGraph, True),
+    ):
+        one = cls()
+        for row in rows:
+            if weighted:
+                one.add(*row)
+            else:
+                one.add(*row[:2])
+        for row in gone:
+            if one.has(row[0], row[1]):
+                one.delete(row[0], row[1])
+
+        edits = []
+        bulk = cls()
+        bulk.subscribe(edits.append)
+        bulk.add_edges(rows if weighted else [row[:2] for row in rows])
+        bulk.delete_edges(gone)
+
+        columns = list(zip(*rows))
+        arrays = cls()
+        arrays.add_edges(*(numpy.array(c) for c in columns[: 3 if weighted else 2]))
+        arrays.delete_edges(numpy.array(columns[0][::3]), numpy.array(columns[1][::3]))
+
+        for g in (bulk, arrays):
+            assert g.num_edges() == one.num_edges()
+            assert sorted(g.edges()) == sorted(one.edges())
+            assert all(type(e[0]) is int for e in g.edges())
+            if weighted:
+                assert g.total_weight() == one.total_weight()
+        assert [e.version for e in edits] == list(range(1, bulk.version + 1))
+        assert arrays.version == bulk.version
+
+
+def test_vertex_index():
+    dg = graphs.WeightedDirectedGraph(("a", "b", 1.0), ("b", "c", 2.0))
+    assert [dg.index.id(v) for v in "abc"] == [0, 1, 2]
+    dg.delete("b", "c")
+    dg.add("d", "b", 1.0)
+    dg.add_edges([("e", "a", 1.0)])
+    # ids are stable, even for the vertices that dropped out
+    assert dg.index.labels() == ["a", "b", "c", "d", "e"]
+    assert dg.index.get("c") == 2 and "c" in dg.index and "x" not in dg.index
+    assert list(dg.index.ids("eda")) == [4, 3, 0]
+    assert dg.index.labels([1, 4]) == ["b", "e"]
+
+    ug = graphs.UndirectedGraph((3, 1), (1, 2))
+    assert [ug.index.label(i) for i in range(3)] == [3, 1, 2]
+    csr = ug.freeze()
+    for v in (1, 2, 3):
+        assert csr.index.label(csr.index.id(v)) == v
@@ -0,0 +1,51 @@
+import os
+import random
+import tempfile
+
+from cspatterns.datastructures import graphs
+from cspatterns.greedy import landmarks, shortest_path
+
+
+def generate_graph(V, E, seed="alt", cls=graphs.WeightedDirectedGraph):
+    rnd = random.Random(seed)
+    g = cls()
+    while g.num_edges() < E:
+        v, w = rnd.randrange(V), rnd.randrange(V)
+        if v != w:
+            g.add(v, w, float(rnd.randint(1, 50)))
+    return g
+
+
+def test_landmark_index():
+    for cls in (graphs.WeightedDirectedGraph, graphs.WeightedUndirectedGraph):
+        g = generate_graph(300, 1200, cls=cls)
+        for strategy in ("farthest", "random"):
+            index = landmarks.LandmarkIndex(g, num_landmarks=4, strategy=strategy, seed=1)
+            assert index.num_landmarks() == 4
+            assert len(set(index.landmarks)) == 4
+
+            rnd = random.Random(strategy)
+            vertices = list(g.vertices())
+            for _ in range(20):
+                s, t = rnd.choice(vertices), rnd.choice(vertices)
+                plain = shortest_path.AStarShortestPath(g, s, t)
+                alt = shortest_path.AStarShortestPath(g, s, t, index.heuristic)
+                assert index.heuristic(s, t) <= plain.get_distance_to(t)
+                assert alt.get_distance_to(t) == plain.get_distance_to(t)
+                assert alt.num_settled() <= plain.num_settled()
+
+    assert index.heuristic("x", 1) == 0
+
+
+def test_landmark_index_persistence():
+    g = generate_graph(100, 400)
+    index = landmarks.LandmarkIndex(g, num_landmarks=3, seed=2)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "alt.idx")
+        index.save(path)
+        loaded = landmarks.LandmarkIndex.load(path)
+
+    assert loaded.landmarks == index.landmarks
+    for v in range(0, 100, 11):
+        for t in range(0, 100, 13):
+            assert loaded.heuristic(v, t) == index.heuristic(v, t)
@@ -1,4 +1,4 @@
-from cspatterns.datastructures import graphs
+from cspatterns.datastructures import graphs, unionfind
 from cspatterns.linear import dfs
 
 
@@ -28,3 +28,53 @@ def test():
 
     bridges = dfs.IdentifyBridges(ug)
     assert sorted(bridges.get_bridges()) == sorted([(6, 7), (0, 5), (11, 12)])
+    assert sorted(dfs.IdentifyBridges(ug.freeze()).get_bridges()) == sorted(
+        [(6, 7), (0, 5), (11, 12)]
+    )
+
+    ug = graphs.UndirectedGraph((1, 2), (2, 3), (3, 1), (3, 4))
+    assert dfs.IdentifyBridges(ug).get_bridges() == [(3, 4)]
+    assert dfs.IdentifyBridges(ug.freeze()).get_bridges() == [(3, 4)]
+
+
+def count_components(edges, skip=None):
+    uf = unionfind.UnionFind(v for e in edges for v in e if v != skip)
+    for v, w in edges:
+        if skip not in (v, w):
+            uf.join(v, w)
+    return uf.num_components()
+
+
+def test_articulation_points():
+    edges = [
+        (0, 1), (1, 2), (2, 6), (0, 6), (6, 7), (7, 8), (7, 10), (8, 10),
+        (0, 5), (5, 3), (5, 4), (3, 4), (4, 9), (4, 11), (9, 11), (11, 12),
+    ]  # fmt: skip
+    ug = graphs.UndirectedGraph(*edges)
+    search = dfs.IdentifyBridges(ug)
+
+    # brute force: removing the vertex splits its component
+    expected = [
+        v for v in ug.vertices() if count_components(edges, skip=v) > count_components(edges)
+    ]
+    assert sorted(search.get_articulation_points()) == sorted(expected) == [0, 4, 5, 6, 7, 11]
+
+    bccs = search.get_biconnected_components()
+    assert sorted(len(c) for c in bccs) == [1, 1, 1, 3, 3, 3, 4]
+    assert sorted(e for c in bccs for e in map(tuple, map(sorted, c))) == sorted(
+        tuple(sorted(e)) for e in edges
+    )
+
+
+def test_deep_graph():
+    # way over the recursion limit
+    ug = graphs.UndirectedGraph(*[(i, i + 1) for i in range(20000)])
+    search = dfs.IdentifyBridges(ug)
+    assert len(search.get_bridges()) == 20000
+    assert len(search.get_articulation_points()) == 19999
+
+    ug.add(20000, 0)
+    search = dfs.IdentifyBridges(ug)
+    assert search.get_bridges() == []
+    assert search.get_articulation_points() == []
+    assert len(search.get_biconnected_components()) == 1
@@ -0,0 +1,152 @@
+import random
+
+from cspatterns.datastructures import graphs
+from cspatterns.greedy import mst
+
+
+def generate_graph(V, E, seed="mst", distinct=False):
+    rnd = random.Random(seed)
+    ug = graphs.WeightedUndirectedGraph()
+    weights = rnd.sample(range(10 * E), E) if distinct else None
+    while ug.num_edges() < E:
+        v, w = rnd.randrange(V), rnd.randrange(V)
+        if v != w and not ug.has(v, w):
+            ug.add(v, w, float(weights[ug.num_edges()] if distinct else rnd.randint(1, 20)))
+    return ug
+
+
+def test_boruvka():
+    uwg = graphs.WeightedUndirectedGraph()
+    uwg.add("a", "b", 3.0)
+    uwg.add("a", "c", 4.0)
+    uwg.add("b", "c", 3.0)
+    uwg.add("c", "d", 2.0)
+
+    tree = mst.BoruvkaMST(uwg).extract()
+    assert sorted(tree.edges()) == [("a", "b", 3.0), ("b", "c", 3.0), ("c", "d", 2.0)]
+    assert tree.total_weight() == 8.0
+
+    for seed in ("a", "b", "c"):
+        # lots of equal weights
+        ug = generate_graph(200, 600, seed=seed)
+        kruskal = mst.KruskalMST(ug).extract()
+        boruvka = mst.BoruvkaMST(ug).extract()
+        assert boruvka.total_weight() == kruskal.total_weight()
+        assert boruvka.num_edges() == kruskal.num_edges()
+
+        # the tree is unique
+        ug = generate_graph(200, 600, seed=seed, distinct=True)
+        assert sorted(mst.BoruvkaMST(ug).extract().edges()) == sorted(
+            mst.KruskalMST(ug).extract().edges()
+        )
+
+
+def test_boruvka_forest():
+    ug = generate_graph(50, 80, seed="forest")
+    ug.add(1000, 1001, 5.0)
+    ug.add(1001, 1002, 1.0)
+    rounds = list(mst.BoruvkaMST(ug).iter())
+    num_components, forest = rounds[-1]
+    assert forest.total_weight() == mst.KruskalMST(ug).extract().total_weight()
+    assert forest.num_edges() == ug.num_vertices() - num_components
+    assert [r[0] for r in rounds] == sorted((r[0] for r in rounds), reverse=True)
+
+    tree = mst.BoruvkaMST(ug.freeze()).extract()
+    assert tree.total_weight() == forest.total_weight()
+
+
+def test_boruvka_workers():
+    ug = generate_graph(300, 2000, seed="workers")
+    tree = mst.BoruvkaMST(ug, workers=2).extract()
+    assert tree.total_weight() == mst.KruskalMST(ug).extract().total_weight()
+    assert tree.num_edges() == mst.BoruvkaMST(ug).extract().num_edges()
+
+
+def test_kruskal_modes(monkeypatch):
+    # small threshold, so that the partitioning gets exercised
+    monkeypatch.setattr(mst, "FILTER_THRESHOLD", 64)
+    for seed in ("a", "b"):
+        for distinct in (False, True):
+            ug = generate_graph(300, 1500, seed=seed, distinct=distinct)
+            ug.add(1000, 1001, 5.0)
+            heap = mst.KruskalMST(ug).extract()
+            for mode in ("sorted", "filter"):
+                tree = mst.KruskalMST(ug, mode=mode).extract()
+                assert tree.total_weight() == heap.total_weight()
+                assert tree.num_edges() == heap.num_edges()
+                if distinct:
+                    assert sorted(tree.edges()) == sorted(heap.edges())
+
+    ug = generate_graph(100, 300, seed="progress")
+    progress = [c for c, _ in mst.KruskalMST(ug, mode="filter").iter()]
+    assert progress == sorted(progress, reverse=True)
+    assert progress[-1] == 1
+
+
+def test_dynamic_mst():
+    rnd = random.Random("dynamic")
+    ug = generate_graph(40, 80, seed="dynamic")
+    dynamic = mst.DynamicMST(ug)
+    assert dynamic.total_weight() == mst.KruskalMST(ug).extract().total_weight()
+
+    for _ in range(400):
+        edges = list(ug.edges())
+        op = rnd.random()
+        if op < 0.4:
+            v, w = rnd.randrange(45), rnd.randrange(45)
+            dynamic.add(v, w, float(rnd.randint(1, 20)))
+        elif op < 0.8:
+            v, w, _ = rnd.choice(edges)
+            dynamic.update_weight(v, w, float(rnd.randint(1, 20)))
+        else:
+            v, w, _ = rnd.choice(edges)
+            dynamic.delete(v, w)
+
+        tree = dynamic.extract()
+        expected = mst.KruskalMST(ug).extract()
+        assert tree.total_weight() == expected.total_weight()
+        assert tree.num_edges() == expected.num_edges()
+        for v, w, weight in tree.edges():
+            assert ug.get_weight(v, w) == weight
+
+    empty = mst.DynamicMST(graphs.WeightedUndirectedGraph())
+    empty.add("a", "b", 1.0)
+    empty.add("b", "c", 2.0)
+    empty.add("a", "c", 1.5)
+    assert sorted(empty.extract().edges()) == [("a", "b", 1.0), ("a", "c", 1.5)]
+
+
+def test_prim():
+    for seed in ("a", "b"):
+        for V, E in ((200, 600), (40, 700)):
+            ug = generate_graph(V, E, seed=seed)
+            expected = mst.KruskalMST(ug).extract()
+            for mode in ("heap", "dense", "auto"):
+                tree = mst.PrimMST(ug, mode=mode).extract()
+                assert tree.total_weight() == expected.total_weight()
+                assert tree.num_edges() == expected.num_edges()
+
+    # disconnected input gives a spanning forest
+    ug = generate_graph(30, 60, seed="forest")
+    ug.add(100, 101, 2.0)
+    ug.add(102, 103, 1.0)
+    expected = mst.KruskalMST(ug).extract()
+    for mode in ("heap", "dense"):
+        trees, forest = list(mst.PrimMST(ug, mode=mode).iter())[-1]
+        assert forest.total_weight() == expected.total_weight()
+        assert forest.num_edges() == ug.num_vertices() - trees
+        assert trees >= 3
+
+    assert mst.PrimMST(graphs.WeightedUndirectedGraph()).extract().num_edges() == 0
+
+
+def test_extract_cache():
+    ug = generate_graph(30, 60, seed="cache")
+    kruskal = mst.KruskalMST(ug)
+    tree = kruskal.extract()
+    assert kruskal.extract() is tree
+
+    v, w, weight = next(iter(tree.edges()))
+    ug.update_weight(v, w, weight + 100)
+    assert kruskal.extract() is not tree
+    assert kruskal.extract().total_weight() == mst.KruskalMST(ug).extract().total_weight()
@@ -0,0 +1,36 @@
+import random
+
+from cspatterns.datastructures import priorityqueue
+
+
+def test_indexed_min_pq():
+    for arity in (2, 4):
+        pq = priorityqueue.IndexedMinPQ(arity=arity)
+        pq.push("a", 5)
+        pq.push("b", 3)
+        pq.push("c", 8)
+
+        assert len(pq) == 3
+        assert "a" in pq and pq.contains("c")
+        assert pq.peek_min() == ("b", 3)
+
+        pq.decrease_key("c", 1)
+        assert pq.priority("c") == 1
+        assert pq.push_or_decrease("a", 7) is False
+        assert pq.push_or_decrease("d", 2) is True
+
+        assert [pq.pop_min() for _ in range(len(pq))] == [("c", 1), ("d", 2), ("b", 3), ("a", 5)]
+        assert "c" not in pq
+
+    pq = priorityqueue.IndexedMinPQ(arity=3)
+    rnd = random.Random("pq")
+    expected = {}
+    for i in range(500):
+        expected[i] = rnd.random()
+        pq.push(i, expected[i])
+    for i in range(0, 500, 3):
+        expected[i] /= 2
+        pq.decrease_key(i, expected[i])
+
+    out = [pq.pop_min() for _ in range(len(pq))]
+    assert out == sorted(expected.items(), key=lambda x: x[1])
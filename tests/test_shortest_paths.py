@@ -1,7 +1,19 @@
+import random
+
 from cspatterns.datastructures import graphs
 from cspatterns.greedy import shortest_path
 
 
+def generate_graph(V, E, seed="dijkstra", cls=graphs.WeightedDirectedGraph):
+    rnd = random.Random(seed)
+    g = cls()
+    while g.num_edges() < E:
+        v, w = rnd.randrange(V), rnd.randrange(V)
+        if v != w:
+            g.add(v, w, float(rnd.randint(1, 50)))
+    return g
+
+
 def test_dijkstra():
     wug = graphs.WeightedDirectedGraph(
         ("a", "b", 3.0),
@@ -14,3 +26,144 @@ def test_dijkstra():
     d = shortest_path.DijkstraShortestPath(wug, "a")
     assert d.get_distance_to("d") == 6.0
     assert d.get_distance_to("x") == float("inf")
+
+    d = shortest_path.DijkstraShortestPath(wug.freeze(), "a")
+    assert d.get_distance_to("d") == 6.0
+
+    assert d.get_path_to("d") == ["a", "b", "c", "d"]
+    assert d.get_path_to("x") == []
+
+    d = shortest_path.DijkstraShortestPath(wug, "a", lazy=True)
+    assert d.get_distance_to("d") == 6.0
+    assert d.get_path_to("d") == ["a", "b", "c", "d"]
+
+    assert shortest_path.shortest_path(wug, "a", "d") == (6.0, ["a", "b", "c", "d"])
+    assert shortest_path.shortest_path(wug, "d", "a") == (float("inf"), [])
+    assert shortest_path.bidirectional_shortest_path(wug, "a", "d") == (6.0, ["a", "b", "c", "d"])
+    assert shortest_path.bidirectional_shortest_path(wug, "d", "a") == (float("inf"), [])
+    assert shortest_path.bidirectional_shortest_path(wug, "a", "a") == (0, ["a"])
+
+
+def test_dijkstra_lazy_and_indexed():
+    g = generate_graph(200, 2000)
+    for source in (0, 17, 150):
+        eager = shortest_path.DijkstraShortestPath(g, source)
+        lazy = shortest_path.DijkstraShortestPath(g, source, lazy=True)
+        assert eager.paths._dist == lazy.paths._dist
+
+
+def test_shortest_paths_arrays():
+    g = generate_graph(200, 1200, seed="arrays")
+    g.add(500, 501, 1.0)  # unreachable from the source
+    for graph in (g, g.freeze()):
+        sp = shortest_path.DijkstraShortestPath(graph, 0)
+        targets = list(g.vertices()) + ["x"]
+        expected = [sp.get_distance_to(v) for v in targets]
+        assert list(sp.distances_to(targets)) == expected
+        assert expected[-1] == float("inf")
+        assert sp.get_path_to(500) == [] and sp.get_path_to(0) == [0]
+        for v in range(0, 200, 11):
+            path = sp.get_path_to(v)
+            assert path[0] == 0 and path[-1] == v
+            assert sum(g.get_weight(a, b) for a, b in zip(path, path[1:])) == sp.get_distance_to(v)
+            assert sp.paths.get_parent(v) == (path[-2] if len(path) > 1 else None)
+
+    # vertices added after the search are unreachable
+    g.add(1000, 1001, 1.0)
+    assert sp.get_distance_to(1001) == float("inf")
+    assert sp.get_path_to(1001) == []
+
+
+def test_point_to_point():
+    for cls in (graphs.WeightedDirectedGraph, graphs.WeightedUndirectedGraph):
+        g = generate_graph(300, 900, seed="p2p", cls=cls)
+        reverse = g.reverse() if cls is graphs.WeightedDirectedGraph else None
+        for source in (1, 50, 299):
+            full = shortest_path.DijkstraShortestPath(g, source)
+            for target in range(0, 300, 7):
+                if not g.has_vertex(target) or not g.has_vertex(source):
+                    continue
+                expected = full.get_distance_to(target)
+                for d, path in (
+                    shortest_path.shortest_path(g, source, target),
+                    shortest_path.bidirectional_shortest_path(g, source, target, reverse),
+                ):
+                    assert d == expected
+                    if d == float("inf"):
+                        assert path == []
+                    else:
+                        assert path[0] == source and path[-1] == target
+                        assert sum(g.get_weight(a, b) for a, b in zip(path, path[1:])) == d
+
+
+def test_astar():
+    # grid with euclidean coordinates; edges are as long as the distance
+    coords = {}
+    g = graphs.WeightedUndirectedGraph()
+    for x in range(15):
+        for y in range(15):
+            coords[(x, y)] = (x, y)
+            if x:
+                g.add((x - 1, y), (x, y), 1.0)
+            if y:
+                g.add((x, y - 1), (x, y), 1.0)
+
+    plain = shortest_path.AStarShortestPath(g, (0, 0), (14, 0))
+    guided = shortest_path.AStarShortestPath(
+        g, (0, 0), (14, 0), shortest_path.euclidean_heuristic(coords)
+    )
+    assert plain.get_distance_to((14, 0)) == guided.get_distance_to((14, 0)) == 14.0
+    assert len(guided.get_path_to((14, 0))) == 15
+    assert guided.num_settled() < plain.num_settled()
+
+    dg = generate_graph(200, 1000, seed="astar")
+    full = shortest_path.DijkstraShortestPath(dg, 0)
+    for target in range(1, 200, 9):
+        astar = shortest_path.AStarShortestPath(dg, 0, target)
+        assert astar.get_distance_to(target) == full.get_distance_to(target)
+
+    assert shortest_path.AStarShortestPath(dg, 0, "x").get_path_to("x") == []
+
+    # Paris -> Prague is about 885 km
+    h = shortest_path.haversine_heuristic({"p": (48.8566, 2.3522), "c": (50.0755, 14.4378)})
+    assert 880 < h("p", "c") < 890
+    assert h("c", "c") == 0
+
+
+def test_dynamic_shortest_path():
+    rnd = random.Random("dynamic")
+    g = generate_graph(60, 200, seed="dynamic")
+    dynamic = shortest_path.DynamicShortestPath(g, 0)
+    edits = []
+    g.subscribe(edits.append)
+
+    for _ in range(300):
+        edges = list(g.edges())
+        op = rnd.random()
+        if op < 0.3:
+            g.add(rnd.randrange(65), rnd.randrange(65), float(rnd.randint(1, 50)))
+        elif op < 0.8:
+            v, w, _ = rnd.choice(edges)
+            g.update_weight(v, w, float(rnd.randint(1, 50)))
+        else:
+            v, w, _ = rnd.choice(edges)
+            g.delete(v, w)
+
+        full = shortest_path.DijkstraShortestPath(g, 0) if g.has_vertex(0) else None
+        for v in range(65):
+            expected = full.get_distance_to(v) if full else (0 if v == 0 else float("inf"))
+            assert dynamic.get_distance_to(v) == expected
+            path = dynamic.get_path_to(v)
+            if expected != float("inf"):
+                assert path[0] == 0 and path[-1] == v
+                assert sum(g.get_weight(a, b) for a, b in zip(path, path[1:])) == expected
+            else:
+                assert path == []
+
+    assert len(edits) == 300
+    assert {e.op for e in edits} == {"add", "update", "delete"}
+
+    dynamic.close()
+    before = dynamic.get_distance_to(63)
+    g.add(0, 63, 0.5)
+    assert dynamic.get_distance_to(63) == before
@@ -0,0 +1,55 @@
+import os
+import random
+import tempfile
+
+from cspatterns.datastructures import graphs, storage
+from cspatterns.greedy import shortest_path
+
+
+def roundtrip(graph):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "graph.bin")
+        storage.save(graph, path)
+        return storage.load(path)
+
+
+def test_save_load():
+    rnd = random.Random("storage")
+    dg = graphs.WeightedDirectedGraph()
+    while dg.num_edges() < 500:
+        dg.add(rnd.randrange(200), rnd.randrange(200), float(rnd.randint(1, 30)))
+
+    mapped = roundtrip(dg)
+    assert isinstance(mapped, graphs.CSRDirectedGraph)
+    assert mapped.num_edges() == dg.num_edges()
+    assert mapped.total_weight() == dg.total_weight()
+    assert sorted(mapped.edges()) == sorted(dg.edges())
+    assert all(type(v) is int for v in mapped.vertices())
+    assert not mapped.has_vertex(1000) and not mapped.has_vertex("x")
+
+    source = next(iter(dg.vertices()))
+    expected = shortest_path.DijkstraShortestPath(dg, source)
+    sp = shortest_path.DijkstraShortestPath(mapped, source)
+    for v in dg.vertices():
+        assert sp.get_distance_to(v) == expected.get_distance_to(v)
+
+
+def test_label_kinds():
+    ug = graphs.WeightedUndirectedGraph(("b", "a", 1.0), ("c", "ä", 2.0), ("a", "c", 0.5))
+    mapped = roundtrip(ug)
+    assert isinstance(mapped, graphs.CSRUndirectedGraph)
+    assert sorted(mapped.edges()) == sorted(ug.edges())
+    assert mapped.get_weight("ä", "c") == 2.0
+    assert sorted(mapped.adj("c")) == [("a", 0.5), ("ä", 2.0)]
+    assert normalize(mapped.find_connected_components()) == normalize(
+        ug.find_connected_components()
+    )
+
+    dg = graphs.DirectedGraph(((0, 1), (1, 0)), ((1, 0), (2, 2)))
+    mapped = roundtrip(dg)
+    assert list(mapped.edges()) == [((0, 1), (1, 0)), ((1, 0), (2, 2))]
+    assert mapped.has((1, 0), (2, 2))
+
+
+def normalize(components):
+    return sorted(sorted(c) for c in components)
@@ -27,4 +27,32 @@ def test_unionfind():
 
     # should be no-op
     uf.join('f', 'c')
-    assert uf.num_components() == 1
\ No newline at end of file
+    assert uf.num_components() == 1
+
+def test_unionfind_bulk():
+    uf = unionfind.UnionFind('abcdef')
+    assert uf.join_many([('a', 'b'), ('b', 'c'), ('a', 'c'), ('e', 'f')]) == 3
+    assert uf.num_components() == 3
+    roots = uf.find_many('abcdef')
+    assert roots[0] == roots[1] == roots[2]
+    assert roots[4] == roots[5] != roots[3]
+
+    # new labels are added on the fly
+    uf.join('g', 'a')
+    assert uf.size() == 7
+    assert uf.is_connected('g', 'c')
+
+
+def test_int_unionfind():
+    uf = unionfind.IntUnionFind(10)
+    assert uf.num_components() == 10
+
+    # long chain; path halving keeps it shallow
+    assert uf.join_many((i, i + 1) for i in range(9)) == 9
+    assert uf.num_components() == 1
+    assert set(uf.find_many(range(10))) == {uf.find(0)}
+    assert uf.join(3, 7) is False
+
+    key = uf.add()
+    assert key == 10 and uf.num_components() == 2
+    assert list(uf.compress()) == [uf.find(0)] * 10 + [10]